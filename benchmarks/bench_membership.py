@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Time ``x in [...]`` rules against small and large constant containers.
+
+Each case is measured with the precomputed members and with the plain
+``In.contains`` scan they replace, for scalar and list valued fields.
+
+    python benchmarks/bench_membership.py [--number N]
+"""
+import argparse
+
+from required.expressions import In, R
+
+from harness import measure, report
+
+SIZES = (4, 64, 1024)
+
+
+def cases(size):
+    container = ["country-%d" % index for index in range(size)]
+    return container, [
+        ("scalar_hit", container[-1]),
+        ("scalar_miss", "country-missing"),
+        ("list_hit", ["country-missing", container[-1]]),
+        ("list_miss", ["country-missing", "other"]),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    for size in SIZES:
+        container, values = cases(size)
+        expression = In(R("x"), container)
+        scan = In(R("x"), container)
+        scan._members = None
+        for case, value in values:
+            data = {"x": value}
+            report(
+                "membership",
+                size=size,
+                case=case,
+                precomputed=measure(lambda: expression(data), number=args.number),
+                scan=measure(lambda: scan(data), number=args.number),
+            )
+
+
+if __name__ == "__main__":
+    main()
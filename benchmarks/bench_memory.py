@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Report the traced memory used per rule for large rule sets.
+
+Every rule reads its own fields so no expression is shared between rules,
+which gives the worst case for interning.
+
+    python benchmarks/bench_memory.py [--rules N]
+"""
+from __future__ import division
+
+import argparse
+import gc
+import tracemalloc
+
+from required import Requires, R, Func
+
+from harness import report
+
+
+def build(count):
+    rules = []
+    for index in range(count):
+        x, y, z = "x%d" % index, "y%d" % index, "z%d" % index
+        rules.append(Requires(x, Func(len, R(y)) > index))
+        rules.append(Requires(R(x) == index, R(z).in_([index, index + 1])))
+    return Requires.combine(rules)
+
+
+def measure_rules(count, compile_plan):
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    requires = build(count)
+    if compile_plan:
+        requires.compile()
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return requires, after - before
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rules", type=int, default=10000)
+    args = parser.parse_args()
+
+    for compile_plan in (False, True):
+        # build(n) adds two rules per index
+        requires, size = measure_rules(args.rules // 2, compile_plan)
+        report(
+            "memory.rules",
+            rules=args.rules,
+            compiled=compile_plan,
+            bytes=size,
+            bytes_per_rule=size / args.rules,
+        )
+        del requires
+
+
+if __name__ == "__main__":
+    main()
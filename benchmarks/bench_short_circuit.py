@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Validate rules combining a cheap check with an expensive callable.
+
+The callable sits on the right hand side of ``and``/``or``, so it should
+only run for the payloads where the cheap check doesn't decide the result.
+Reports the time per validation and how often the callable ran.
+
+    python benchmarks/bench_short_circuit.py [--number N]
+"""
+from __future__ import division
+
+import argparse
+
+from required import RequirementError
+from required.dsl import build_requirements_factory, init_parser, init_transformer
+
+from harness import measure, report
+
+CALLS = []
+
+
+def expensive(value):
+    CALLS.append(value)
+    return sum(range(200)) and value
+
+
+RULES = {
+    "and": "x -> x > 0 and expensive(y) > 0",
+    "or": "x -> x > 0 or expensive(y) > 0",
+}
+
+PAYLOADS = {
+    # the lhs decides the result for every one of these
+    "decided": {"and": {"x": 0, "y": 1}, "or": {"x": 1, "y": 1}},
+    # the rhs has to be evaluated
+    "undecided": {"and": {"x": 1, "y": 1}, "or": {"x": 0, "y": 1}},
+}
+
+
+def validator(requires, data):
+    validate = requires.validate
+
+    def run():
+        try:
+            validate(data)
+        except RequirementError:
+            pass
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=10000)
+    args = parser.parse_args()
+
+    build = build_requirements_factory(
+        init_parser(), init_transformer({"expensive": expensive}))
+
+    for name, rules in sorted(RULES.items()):
+        requires = build(rules)
+        for case, payloads in sorted(PAYLOADS.items()):
+            run = validator(requires, payloads[name])
+            del CALLS[:]
+            run()
+            calls_per_validation = len(CALLS)
+            report(
+                "short_circuit.%s" % name,
+                case=case,
+                seconds=measure(run, number=args.number),
+                callable_calls=calls_per_validation,
+            )
+
+
+if __name__ == "__main__":
+    main()
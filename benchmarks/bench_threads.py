@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Validate one shared Requires from several threads.
+
+Reports throughput per thread count and the traced memory growth over
+many validations, which should stay flat.
+
+    python benchmarks/bench_threads.py [--calls N]
+"""
+from __future__ import division
+
+import argparse
+import threading
+import time
+import tracemalloc
+
+from required import Requires, R, RequirementError
+
+from harness import report
+
+
+def build_requires():
+    return (
+        Requires("x", "z") +
+        Requires(R("x") == 1, "y") +
+        Requires(R("x") == 2, R("y") > 1) +
+        Requires("y", "z")
+    )
+
+
+PAYLOADS = [
+    {"x": 1, "y": 1, "z": 1},
+    {"x": 1, "z": 1},
+    {"x": 2, "y": 2, "z": 1},
+    {"x": 3, "z": 1},
+]
+
+
+def hammer(requires, calls):
+    validate = requires.validate
+    for index in range(calls):
+        try:
+            validate(PAYLOADS[index % len(PAYLOADS)])
+        except RequirementError:
+            pass
+
+
+def throughput(requires, thread_count, calls):
+    threads = [
+        threading.Thread(target=hammer, args=(requires, calls))
+        for _ in range(thread_count)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return thread_count * calls / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=100000)
+    args = parser.parse_args()
+
+    requires = build_requires()
+    requires.compile()
+
+    for thread_count in (1, 2, 4, 8):
+        report(
+            "threads.throughput",
+            threads=thread_count,
+            calls_per_second=throughput(requires, thread_count, args.calls),
+        )
+
+    tracemalloc.start()
+    hammer(requires, 1000)
+    before, _ = tracemalloc.get_traced_memory()
+    hammer(requires, args.calls * 10)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    report(
+        "threads.memory",
+        calls=args.calls * 10,
+        bytes_before=before,
+        bytes_after=after,
+        growth=after - before,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""
+Timing helpers shared by the benchmark scripts.
+
+Every result is written to stdout as one JSON object per line so runs can
+be collected and compared.
+"""
+from __future__ import print_function
+
+import json
+import sys
+import timeit
+
+
+def measure(func, number=1000, repeat=5):
+    """
+    Return the best time in seconds of a single call to ``func``.
+    """
+    timer = timeit.Timer(func)
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def report(benchmark, **fields):
+    fields["benchmark"] = benchmark
+    print(json.dumps(fields, sort_keys=True))
+    sys.stdout.flush()
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite covering parsing, composing, validating and the decorator.
+
+Every benchmark is run over the product of its scaling axes and reported as
+one JSON object per line. ``--output`` also writes the whole run to a file
+which a later run can be compared against with ``--compare``.
+
+    python benchmarks/suite.py [--quick] [--filter NAME] [--output FILE]
+                               [--compare FILE]
+"""
+from __future__ import division, print_function
+
+import argparse
+import itertools
+import json
+import platform
+import sys
+
+import required
+from required import Requires, R, Func, validate
+from required import dsl
+from required.dsl import build_requirements_factory, init_parser, init_transformer
+
+from harness import measure, report
+
+BENCHMARKS = []
+
+
+def benchmark(name, quick=None, **axes):
+    """
+    Register a benchmark run for every combination of ``axes``, ``quick``
+    overrides axes with smaller values for ``--quick`` runs.
+
+    The benchmark returns the function to time and the number of calls per
+    repeat, optionally followed by the number of items a call handles to
+    also report the time per item.
+    """
+    def register(func):
+        BENCHMARKS.append((name, func, axes, quick or {}))
+        return func
+    return register
+
+
+def spin(cost):
+    # a callable whose cost grows linearly with ``cost``
+    def call(value):
+        for _ in range(cost):
+            pass
+        return value
+    return call
+
+
+def chain(depth):
+    # f0 -> f1 -> ... -> f<depth>
+    return Requires.combine(
+        Requires("f%d" % index, "f%d" % (index + 1)) for index in range(depth))
+
+
+@benchmark("parser.init")
+def bench_parser_init():
+    def run():
+        dsl._parser = None
+        init_parser()
+    return run, 1
+
+
+@benchmark("dsl.transform", rules=[1, 10, 100], quick={"rules": [1, 10]})
+def bench_dsl_transform(rules):
+    text = "\n".join("f%d -> f%d > %d" % (index, index + 1, index) for index in range(rules))
+    build = build_requirements_factory(init_parser(), init_transformer({}), cache=None)
+    return lambda: build(text), 1000 // rules or 1
+
+
+@benchmark("requires.add", rules=[10, 100, 1000], quick={"rules": [10, 100]})
+def bench_requires_add(rules):
+    parts = [Requires("f%d" % index, "f%d" % (index + 1)) for index in range(rules)]
+
+    def run():
+        total = parts[0]
+        for part in parts[1:]:
+            total = total + part
+    return run, 10000 // rules or 1
+
+
+@benchmark("requires.combine", rules=[10, 100, 1000], quick={"rules": [10, 100]})
+def bench_requires_combine(rules):
+    parts = [Requires("f%d" % index, "f%d" % (index + 1)) for index in range(rules)]
+    return lambda: Requires.combine(parts), 10000 // rules or 1
+
+
+@benchmark("requires.compile", depth=[10, 100, 500], quick={"depth": [10, 100]})
+def bench_requires_compile(depth):
+    requires = chain(depth)
+
+    def run():
+        requires._plan = None
+        requires.compile()
+    return run, 1000 // depth or 1
+
+
+@benchmark("requires.deps", depth=[10, 100, 500], quick={"depth": [10, 100]})
+def bench_requires_deps(depth):
+    requires = chain(depth)
+    return lambda: requires.deps("f0", 1), 1000 // depth or 1
+
+
+@benchmark("validate.rules", rules=[1, 10, 100], quick={"rules": [1, 10]})
+def bench_validate_rules(rules):
+    # every rule hangs off the same field
+    requires = Requires.combine(
+        Requires("x", R("f%d" % index) > 0) for index in range(rules))
+    data = dict(("f%d" % index, 1) for index in range(rules))
+    data["x"] = 1
+    requires.compile()
+    return lambda: requires.validate(data), 10000 // rules or 1
+
+
+@benchmark("validate.depth", depth=[1, 10, 100], quick={"depth": [1, 10]})
+def bench_validate_depth(depth):
+    requires = chain(depth)
+    data = dict(("f%d" % index, 1) for index in range(depth + 1))
+    requires.compile()
+    return lambda: requires.validate(data), 10000 // depth or 1
+
+
+@benchmark("validate.chain", depth=[10, 100, 1000, 10000], quick={"depth": [10, 1000]})
+def bench_validate_chain(depth):
+    # every field of the chain present, dependents last so each field is
+    # reached before the fields depending on it
+    requires = chain(depth)
+    data = dict(("f%d" % index, 1) for index in reversed(range(depth + 1)))
+    requires.compile()
+    return lambda: requires.validate(data), 10000 // depth or 1, depth + 1
+
+
+@benchmark("validate.partials", partials=[1, 10, 100], quick={"partials": [1, 10]})
+def bench_validate_partials(partials):
+    requires = Requires.combine(
+        Requires(R("x") == index, "y") for index in range(partials))
+    data = {"x": 0, "y": 1}
+    requires.compile()
+    return lambda: requires.validate(data), 10000 // partials or 1
+
+
+@benchmark("validate.width", width=[1, 10, 100, 1000], rules=[1, 12],
+           quick={"width": [1, 100, 1000]})
+def bench_validate_width(width, rules):
+    # a fixed number of rules, payloads with many fields that have none
+    requires = Requires.combine(
+        Requires("f%d" % index, "g%d" % index) for index in range(rules))
+    data = dict(("g%d" % index, 1) for index in range(rules))
+    data.update(("f%d" % index, 1) for index in range(max(width, rules)))
+    requires.compile()
+    return lambda: requires.validate(data), 10000
+
+
+@benchmark("revalidate", width=[10, 100, 1000], quick={"width": [10, 1000]})
+def bench_revalidate(width):
+    # one field of an object with many rules changes
+    requires = Requires.combine(
+        Requires("f%d" % index, R("g%d" % index) > 0) for index in range(width))
+    data = dict(("f%d" % index, 1) for index in range(width))
+    data.update(("g%d" % index, 1) for index in range(width))
+    requires.revalidate(data, ["g0"])
+    return lambda: requires.revalidate(data, ["g0"]), 10000
+
+
+def flatten(value, prefix=""):
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        items = enumerate(value)
+    else:
+        return {prefix[:-1]: value}
+    flat = {}
+    for key, child in items:
+        flat.update(flatten(child, "%s%s." % (prefix, key)))
+    return flat
+
+
+class Record(object):
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+@benchmark("validate.nested", shape=["flattened", "nested", "object"], rules=[1, 10],
+           quick={"rules": [10]})
+def bench_validate_nested(shape, rules):
+    # a nested record, flattened on every call as callers had to before
+    # paths, validated in place, or an object read by attribute
+    requires = Requires.combine(
+        Requires("order.lines.%d.sku" % index, R("order.lines.%d.qty" % index) > 0)
+        for index in range(rules))
+    lines = [{"sku": "s%d" % index, "qty": 1} for index in range(rules)]
+    data = {"order": {"id": 1, "lines": lines, "notes": {"text": "x" * 10}}}
+    requires.compile()
+    if shape == "flattened":
+        return lambda: requires.validate(flatten(data)), 10000
+    if shape == "object":
+        data = Record(order=Record(id=1, lines=[Record(**line) for line in lines]))
+    return lambda: requires.validate(data), 10000
+
+
+@benchmark("validate.callable", cost=[0, 100, 1000], quick={"cost": [0, 100]})
+def bench_validate_callable(cost):
+    requires = Requires("x", Func(spin(cost), R("x")) > 0)
+    data = {"x": 1}
+    requires.compile()
+    return lambda: requires.validate(data), 1000
+
+
+@benchmark("decorator.call", wrapped=[False, True], arguments=[1, 5])
+def bench_decorator_call(wrapped, arguments):
+    names = ["a%d" % index for index in range(arguments)]
+    namespace = {}
+    exec("def func(%s):\n    'a0 -> a0 > 0'\n    return a0" % ", ".join(names), namespace)
+    func = namespace["func"]
+    if wrapped:
+        func = validate(func)
+    args = tuple(range(1, arguments + 1))
+    return lambda: func(*args), 10000
+
+
+def run_suite(name_filter=None, quick=False, repeat=5):
+    results = []
+    for name, factory, axes, quick_axes in BENCHMARKS:
+        if name_filter and name_filter not in name:
+            continue
+        if quick:
+            axes = dict(axes, **quick_axes)
+        axis_names = sorted(axes)
+        for values in itertools.product(*[axes[axis] for axis in axis_names]):
+            params = dict(zip(axis_names, values))
+            case = factory(**params)
+            func, number = case[:2]
+            seconds = measure(func, number=number, repeat=repeat)
+            params["seconds"] = seconds
+            if len(case) > 2:
+                params["seconds_per_item"] = seconds / case[2]
+            report(name, **params)
+            params["benchmark"] = name
+            results.append(params)
+    return results
+
+
+def result_key(result):
+    return tuple(sorted(
+        (key, value) for key, value in result.items()
+        if key not in ("seconds", "seconds_per_item")))
+
+
+def compare(results, baseline):
+    """
+    Print the time of every result relative to the same case in
+    ``baseline``, a file written by ``--output``.
+    """
+    with open(baseline) as f:
+        previous = dict(
+            (result_key(result), result["seconds"]) for result in json.load(f)["results"])
+    for result in results:
+        before = previous.get(result_key(result))
+        if before:
+            report("compare", case=dict(result_key(result)),
+                   before=before, after=result["seconds"],
+                   ratio=result["seconds"] / before)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--quick", action="store_true", help="smaller axes and fewer repeats")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier --output run")
+    args = parser.parse_args()
+
+    results = run_suite(args.filter, args.quick, repeat=3 if args.quick else 5)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "version": required.__version__,
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "platform": sys.platform,
+                "results": results,
+            }, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -34,6 +34,10 @@ INSTALL_REQUIRES = [
     "six",
     "lark-parser"
 ]
+EXTRAS_REQUIRE = {
+    "numpy": ["numpy"],
+    "pandas": ["numpy", "pandas"],
+}
 
 ###################################################################
 
@@ -86,4 +90,5 @@ if __name__ == "__main__":
         zip_safe=False,
         classifiers=CLASSIFIERS,
         install_requires=INSTALL_REQUIRES,
+        extras_require=EXTRAS_REQUIRE,
     )
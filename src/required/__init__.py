@@ -2,9 +2,11 @@ from __future__ import absolute_import, division, print_function
 
 from .requires import Requires, empty
 from .expressions import R, Func
-from .decorator import validate
-from .dsl import init_parser, init_transformer, build_requirements_factory
-from .exceptions import RequiredSyntaxError, RequirementError, ResolveError, DecoratorError
+from .callables import pure
+from .bundle import load_bundle
+from .decorator import validate, warmup
+from .dsl import init_parser, init_transformer, build_requirements_factory, requirements_cache
+from .exceptions import RequiredSyntaxError, RequirementError, ResolveError, DecoratorError, BundleError
 
 __version__ = "0.4.0"
 
@@ -23,13 +25,18 @@ __all__ = [
     "Requires",
     "R",
     "Func",
+    "pure",
+    "load_bundle",
     "empty",
     "validate",
+    "warmup",
     "build_requirements_factory",
     "init_parser",
     "init_transformer",
+    "requirements_cache",
     "RequirementError",
     "RequiredSyntaxError",
     "ResolveError",
     "DecoratorError",
+    "BundleError",
 ]
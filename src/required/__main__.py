@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""
+Command line tools.
+
+    python -m required precompile <package> [--output PATH]
+"""
+from __future__ import print_function, unicode_literals
+
+import sys
+import argparse
+
+from .bundle import BUNDLE_FILENAME, precompile
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m required")
+    commands = parser.add_subparsers(dest="command")
+
+    precompile_parser = commands.add_parser(
+        "precompile", help="write a bundle of the rules of a package")
+    precompile_parser.add_argument("package", help="importable name of the package")
+    precompile_parser.add_argument(
+        "--output", help="bundle path, defaults to %s in the package" % BUNDLE_FILENAME)
+
+    args = parser.parse_args(argv)
+    if args.command != "precompile":
+        parser.print_help()
+        return 2
+
+    sys.path.insert(0, "")
+    path, entries = precompile(args.package, args.output)
+    print("wrote %d rule sets to %s" % (entries, path))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
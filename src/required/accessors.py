@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Reading fields out of the records being validated.
+
+A field may be a dotted path, ``address.postcode`` or ``items.0.sku``, each
+segment of which is read from the value the previous one returned by the
+:class:`Accessor` registered for its type. Mappings are indexed by key,
+lists and tuples by position, and anything else by attribute, so nested
+JSON and objects are validated in place rather than flattened first.
+"""
+from __future__ import unicode_literals
+
+import threading
+
+import six
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+
+class Accessor(object):
+    """
+    Reads a single segment of a path from a record.
+
+    ``get`` raises :class:`KeyError` when the record has no such field.
+    """
+
+    def get(self, record, key):
+        raise NotImplementedError
+
+
+class MappingAccessor(Accessor):
+
+    def get(self, record, key):
+        return record[key]
+
+
+class SequenceAccessor(Accessor):
+
+    def get(self, record, key):
+        if not key.isdigit():
+            # named fields of namedtuples
+            return ATTRIBUTE.get(record, key)
+        try:
+            return record[int(key)]
+        except IndexError:
+            raise KeyError(key)
+
+
+class AttributeAccessor(Accessor):
+
+    def get(self, record, key):
+        try:
+            return getattr(record, key)
+        except AttributeError:
+            raise KeyError(key)
+
+
+MAPPING = MappingAccessor()
+SEQUENCE = SequenceAccessor()
+ATTRIBUTE = AttributeAccessor()
+
+_registry = {}
+_resolved = {}
+_lock = threading.Lock()
+
+
+def register(record_type, accessor):
+    """
+    Read the fields of ``record_type`` and its subclasses with ``accessor``.
+    """
+    with _lock:
+        _registry[record_type] = accessor
+        _resolved.clear()
+
+
+def accessor_for(record_type):
+    accessor = _resolved.get(record_type)
+    if accessor is not None:
+        return accessor
+
+    for base in record_type.__mro__:
+        accessor = _registry.get(base)
+        if accessor is not None:
+            break
+    else:
+        if issubclass(record_type, Mapping):
+            accessor = MAPPING
+        elif issubclass(record_type, (list, tuple)):
+            accessor = SEQUENCE
+        else:
+            accessor = ATTRIBUTE
+    _resolved[record_type] = accessor
+    return accessor
+
+
+class Path(object):
+    """
+    A field compiled to the segments read to resolve it.
+
+    Calling the path with a record returns the value of the field, raising
+    :class:`KeyError` if any segment is missing. A mapping holding the
+    whole path as a key, as a flattened payload does, is read directly.
+    Plain dicts and lists are always read by key and position.
+    """
+    __slots__ = ("field", "segments", "_steps")
+
+    def __init__(self, field):
+        self.field = field
+        self.segments = tuple(field.split("."))
+        self._steps = tuple(
+            (segment, int(segment) if segment.isdigit() else None)
+            for segment in self.segments)
+
+    def __call__(self, record):
+        if type(record) is dict and self.field in record:
+            return record[self.field]
+        value = record
+        try:
+            for segment, index in self._steps:
+                value_type = type(value)
+                if value_type is dict:
+                    value = value[segment]
+                elif value_type is list and index is not None:
+                    value = value[index]
+                else:
+                    value = accessor_for(value_type).get(value, segment)
+        except (KeyError, IndexError):
+            raise KeyError(self.field)
+        return value
+
+
+_paths = {}
+
+
+def path(field):
+    """
+    Return the :class:`Path` of ``field``, compiling it on first use.
+    """
+    compiled = _paths.get(field)
+    if compiled is None:
+        compiled = _paths[field] = Path(field)
+    return compiled
+
+
+def is_path(field):
+    return isinstance(field, six.string_types) and "." in field
+
+
+_missing = object()
+
+
+class Record(Mapping):
+    """
+    Read only view of ``data`` as a mapping of ``fields``, which are read
+    through their paths without copying ``data``.
+
+    Each field is read once, ``data`` must not change while the view is in
+    use. Iterating yields the fields present in ``data``, in the order given.
+    """
+    __slots__ = ("data", "fields", "_values")
+
+    def __init__(self, data, fields):
+        self.data = data
+        self.fields = fields
+        self._values = {}
+
+    def __getitem__(self, field):
+        values = self._values
+        value = values.get(field, _missing)
+        if value is _missing:
+            if field in values or not isinstance(field, six.string_types):
+                raise KeyError(field)
+            try:
+                value = values[field] = path(field)(self.data)
+            except KeyError:
+                values[field] = _missing
+                raise
+        return value
+
+    def __contains__(self, field):
+        try:
+            self[field]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        return (field for field in self.fields if field in self)
+
+    def __len__(self):
+        return sum(1 for _ in self)
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+asyncio support, only imported on Python 3.5+.
+
+Callables registered with ``Func`` may return awaitables; they are awaited
+and independent operands and dependencies are resolved concurrently. Errors
+are reported in the same order the synchronous plan would raise them.
+"""
+import asyncio
+import functools
+import inspect
+
+from .exceptions import RequirementError, ResolveError
+from .expressions import RExpression, R, FieldOp, GenericOp, In, And, Or, Not
+
+
+async def gather_in_order(*awaitables):
+    # resolve concurrently but raise the first error in argument order,
+    # like sequential evaluation would
+    results = await asyncio.gather(*awaitables, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
+async def resolve(value, data):
+    if isinstance(value, R):
+        if isinstance(value.field, FieldOp):
+            try:
+                return await resolve(value.field, data)
+            except KeyError:
+                raise ResolveError(value.field,
+                                   'missing key %s in data' % value.field)
+        try:
+            return data[value.field]
+        except KeyError:
+            raise ResolveError(value.field,
+                               'missing key %s in data' % value.field)
+
+    if isinstance(value, FieldOp):
+        args = await gather_in_order(*[
+            resolve(arg, data) if isinstance(arg, R) else constant(arg)
+            for arg in value.args
+        ])
+        kwargs = dict(zip(value.kwargs, await gather_in_order(*[
+            resolve(arg, data) if isinstance(arg, R) else constant(arg)
+            for arg in value.kwargs.values()
+        ])))
+        result = value.operator(*args, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    if isinstance(value, In) and value._members is not None:
+        return value.contains_constant(await resolve(value.field, data))
+
+    if isinstance(value, In):
+        field, values = await gather_in_order(
+            resolve(value.field, data), resolve(value.values, data))
+        return value.contains(field, values)
+
+    if isinstance(value, (And, Or)):
+        # short circuits, the rhs is only awaited when it decides the result
+        lhs = await resolve(value.lhs, data)
+        if bool(lhs) is isinstance(value, Or):
+            return lhs
+        return await resolve(value.rhs, data)
+
+    if isinstance(value, Not):
+        return not await resolve(value.operand, data)
+
+    if isinstance(value, GenericOp):
+        lhs, rhs = await gather_in_order(
+            resolve(value.lhs, data), resolve(value.rhs, data))
+        return value.get_operator()(lhs, rhs)
+
+    if isinstance(value, RExpression):
+        return value(data)
+
+    return value
+
+
+async def constant(value):
+    return value
+
+
+async def deps(plan, field, value):
+    direct = plan._edges.get(field, ())
+    partials = plan._partials.get(field)
+    if not partials:
+        return direct
+
+    lookup = {field: value}
+    fired = await gather_in_order(*[
+        resolve(condition, lookup) for condition, _ in partials
+    ])
+    return plan._expand(direct, [
+        entries for (_, entries), condition in zip(partials, fired) if condition
+    ])
+
+
+async def check(field, dependency, data, evaluate):
+    dependency_name = dependency.name
+    if dependency_name not in data:
+        raise RequirementError(
+            field, dependency_name, None,
+            "%s requires '%s' to be present" % (field, dependency_name))
+
+    expression = dependency.expression
+    if expression is None:
+        return
+
+    try:
+        if not await evaluate(expression):
+            error_message = dependency.message or expression.error(
+                field, dependency_name, data)
+            raise RequirementError(field, dependency_name, expression,
+                                   error_message)
+    except ResolveError as e:
+        raise RequirementError(
+            field, dependency_name, None,
+            "%s requires '%s' to be present" % (field, e.missing_field))
+
+
+async def avalidate(plan, data):
+    """
+    Validate ``data`` against ``plan`` without blocking the event loop.
+    """
+    fields = list(data)
+    field_deps = await gather_in_order(*[
+        deps(plan, field, data[field]) for field in fields
+    ])
+
+    # each distinct expression is evaluated once, however many fields
+    # depend on it
+    pending = {}
+
+    def evaluate(expression):
+        key = id(expression)
+        if key not in pending:
+            pending[key] = asyncio.ensure_future(resolve(expression, data))
+        return pending[key]
+
+    try:
+        await gather_in_order(*[
+            check(field, dependency, data, evaluate)
+            for field, dependencies in zip(fields, field_deps)
+            for dependency in dependencies
+        ])
+    finally:
+        for future in pending.values():
+            if not future.done():
+                future.cancel()
+            elif not future.cancelled():
+                # errors are re-raised through check, don't warn about them
+                future.exception()
+
+
+def async_validate_wrapper(func, bind_arguments, plan):
+    @functools.wraps(func)
+    async def func_wrapper(*args, **kwargs):
+        await plan.avalidate(bind_arguments(args, kwargs))
+        return await func(*args, **kwargs)
+    return func_wrapper
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Precompiled rule bundles.
+
+A bundle maps the normalized rules of docstrings to their serialized
+:class:`Requires`, so processes can load rules without running the parser.
+Callables are stored by the name they were registered under and looked up
+again in the callables in scope when the bundle is used.
+"""
+from __future__ import unicode_literals
+
+import io
+import os
+import json
+import hashlib
+import inspect
+import pkgutil
+import operator
+import importlib
+import threading
+
+import six
+
+from .requires import Requires, Dependency
+from .expressions import (
+    R, FieldOp, GenericOp, In, Not, And, Or,
+    Lte, Gte, Eq, Lt, Gt, NotEq,
+)
+from .exceptions import BundleError
+
+FORMAT = 1
+
+BUNDLE_FILENAME = "required-bundle.json"
+
+NODE_TYPES = dict(
+    (node_type.__name__, node_type)
+    for node_type in (In, Not, And, Or, Lte, Gte, Eq, Lt, Gt, NotEq))
+
+
+def bundle_key(rules, callables_dict):
+    # rules only depend on the names of the callables in scope, the
+    # callables themselves differ from process to process
+    digest = hashlib.sha1(rules.encode("utf-8")).hexdigest()
+    return "%s:%s" % (digest, ",".join(sorted(callables_dict)))
+
+
+class Encoder(object):
+
+    def __init__(self, callables_dict):
+        self.names = dict((id(func), name) for name, func in callables_dict.items())
+
+    def callable(self, func):
+        name = getattr(func, "__name__", None)
+        if name and getattr(operator, name, None) is func:
+            return {"operator": name}
+        if id(func) in self.names:
+            return {"callable": self.names[id(func)]}
+        raise BundleError("%r is not a registered callable" % (func, ))
+
+    def encode(self, value):
+        if isinstance(value, R):
+            return {"R": self.encode(value.field)}
+        if isinstance(value, FieldOp):
+            return {
+                "FieldOp": self.callable(value.operator),
+                "args": [self.encode(arg) for arg in value.args],
+                "kwargs": dict(
+                    (name, self.encode(arg)) for name, arg in value.kwargs.items()),
+            }
+        if isinstance(value, In):
+            return {"In": [self.encode(value.field), self.encode(value.values)]}
+        if isinstance(value, Not):
+            return {"Not": [self.encode(value.operand)]}
+        if isinstance(value, GenericOp) and type(value).__name__ in NODE_TYPES:
+            return {type(value).__name__: [self.encode(value.lhs), self.encode(value.rhs)]}
+        if isinstance(value, (list, tuple)):
+            return {type(value).__name__: [self.encode(item) for item in value]}
+        if value is None or isinstance(value, (bool, float) + six.integer_types + six.string_types):
+            return value
+        raise BundleError("can't serialize %r" % (value, ))
+
+    def dependency(self, dependency):
+        return [
+            self.encode(dependency.name), self.encode(dependency.expression),
+            dependency.message,
+        ]
+
+
+class Decoder(object):
+
+    def __init__(self, callables_dict):
+        self.callables_dict = callables_dict
+
+    def callable(self, ref):
+        if "operator" in ref:
+            return getattr(operator, ref["operator"])
+        try:
+            return self.callables_dict[ref["callable"]]
+        except KeyError:
+            raise BundleError("callable %s is not registered" % ref["callable"])
+
+    def decode(self, value):
+        if not isinstance(value, dict):
+            return value
+        (tag, operands), = [
+            (key, value[key]) for key in value if key not in ("args", "kwargs")]
+        if tag == "R":
+            return R(self.decode(operands))
+        if tag == "FieldOp":
+            kwargs = dict(
+                (str(name), self.decode(arg)) for name, arg in value["kwargs"].items())
+            return FieldOp(
+                self.callable(operands), *[self.decode(arg) for arg in value["args"]], **kwargs)
+        if tag == "list":
+            return [self.decode(item) for item in operands]
+        if tag == "tuple":
+            return tuple(self.decode(item) for item in operands)
+        if tag in NODE_TYPES:
+            return NODE_TYPES[tag](*[self.decode(operand) for operand in operands])
+        raise BundleError("unknown node %s" % tag)
+
+    def dependency(self, value):
+        name, expression, message = value
+        return Dependency(self.decode(name), self.decode(expression), message)
+
+
+def dump_requires(requires, callables_dict):
+    """
+    Serialize ``requires`` to a JSON compatible list. Raises
+    :class:`BundleError` if it uses a callable not in ``callables_dict``.
+    """
+    encoder = Encoder(callables_dict)
+    return [
+        [encoder.encode(from_), [encoder.dependency(dep) for dep in deps]]
+        for from_, deps in requires.rules()
+    ]
+
+
+def load_requires(rules, callables_dict):
+    """
+    Rebuild a :class:`Requires` serialized with :func:`dump_requires`.
+    """
+    decoder = Decoder(callables_dict)
+    return Requires.from_rules(
+        (decoder.decode(from_), [decoder.dependency(dep) for dep in deps])
+        for from_, deps in rules)
+
+
+class Bundles(object):
+    """
+    Entries of every loaded bundle, consulted by
+    ``build_requirements_factory`` before parsing.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, entries):
+        with self._lock:
+            self._entries.update(entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, rules, callables_dict):
+        """
+        Return the :class:`Requires` for ``rules`` or ``None`` when no
+        loaded bundle has them.
+        """
+        entry = self._entries.get(bundle_key(rules, callables_dict))
+        if entry is None:
+            return None
+        try:
+            return load_requires(entry, callables_dict)
+        except BundleError:
+            return None
+
+
+bundles = Bundles()
+
+
+def read_bundle(path):
+    from . import __version__
+    with io.open(path, encoding="utf-8") as f:
+        bundle = json.load(f)
+    if bundle.get("format") != FORMAT or bundle.get("version") != __version__:
+        # written by another version of required, the grammar may differ
+        return {}
+    return bundle["entries"]
+
+
+def load_bundle(path):
+    """
+    Load the bundle at ``path`` so the rules it contains are no longer
+    parsed. Bundles written by another version of required are ignored.
+
+    Returns the number of entries loaded.
+    """
+    entries = read_bundle(path)
+    bundles.add(entries)
+    return len(entries)
+
+
+def write_bundle(path, entries):
+    from . import __version__
+    bundle = {"format": FORMAT, "version": __version__, "entries": entries}
+    with io.open(path, "w", encoding="utf-8") as f:
+        f.write(six.text_type(json.dumps(bundle, separators=(",", ":"), sort_keys=True)))
+
+
+def iter_modules(package_name):
+    package = importlib.import_module(package_name)
+    yield package
+    if not hasattr(package, "__path__"):
+        return
+    for _, name, _ in pkgutil.walk_packages(package.__path__, package_name + "."):
+        yield importlib.import_module(name)
+
+
+def iter_validated(module):
+    # decorated functions at module level and on classes defined there
+    for value in list(vars(module).values()):
+        if inspect.isclass(value):
+            members = [getattr(member, "__func__", member) for member in vars(value).values()]
+        else:
+            members = [value]
+        for member in members:
+            rules = getattr(member, "_required_rules", None)
+            if rules is not None:
+                yield rules
+
+
+def precompile(package_name, path=None):
+    """
+    Import every module of ``package_name`` and write a bundle of the rules
+    of its ``@validate`` decorated functions, next to the package by default.
+
+    Returns the path written and the number of entries.
+    """
+    from .dsl import build_requirements_factory, init_parser, init_transformer, normalize_rules
+
+    entries = {}
+    for module in iter_modules(package_name):
+        for docstring, callables_dict in iter_validated(module):
+            rules = normalize_rules(docstring)
+            key = bundle_key(rules, callables_dict)
+            if key in entries:
+                continue
+            build = build_requirements_factory(
+                init_parser(), init_transformer(callables_dict), cache=None)
+            entries[key] = dump_requires(build(rules), callables_dict)
+
+    if path is None:
+        package = importlib.import_module(package_name)
+        path = os.path.join(os.path.dirname(package.__file__), BUNDLE_FILENAME)
+    write_bundle(path, entries)
+    return path, len(entries)
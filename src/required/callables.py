@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import time
+import inspect
+import threading
+
+from collections import OrderedDict
+
+from .dsl import CacheInfo
+
+monotonic = getattr(time, "monotonic", time.time)
+
+_missing = object()
+
+
+class PureCallable(object):
+    """
+    Wraps a side effect free callable and caches its results in a bounded
+    LRU, keyed on the arguments.
+
+    Calls with unhashable arguments are passed straight through. A
+    ``maxsize`` of ``None`` makes the cache unbounded, results older than
+    ``ttl`` seconds are computed again.
+    """
+
+    def __init__(self, func, maxsize=128, ttl=None, clock=monotonic):
+        iscoroutinefunction = getattr(inspect, "iscoroutinefunction", None)
+        if iscoroutinefunction is not None and iscoroutinefunction(func):
+            raise TypeError("coroutine functions can't be cached as pure")
+        self.func = func
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.__name__ = getattr(func, "__name__", type(func).__name__)
+        self.__doc__ = getattr(func, "__doc__", None)
+
+    def __call__(self, *args, **kwargs):
+        key = (args, frozenset(kwargs.items())) if kwargs else args
+        try:
+            hash(key)
+        except TypeError:
+            return self.func(*args, **kwargs)
+
+        now = self.clock() if self.ttl is not None else None
+        with self._lock:
+            entry = self._entries.pop(key, _missing)
+            if entry is not _missing and (now is None or now - entry[1] < self.ttl):
+                self._entries[key] = entry
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        value = self.func(*args, **kwargs)
+        with self._lock:
+            self._entries[key] = (value, now)
+            self._evict()
+        return value
+
+    def _evict(self):
+        if self.maxsize is None:
+            return
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def cache_info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def cache_clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def pure(func=None, maxsize=128, ttl=None):
+    """
+    Mark ``func`` as pure so its results are cached when called from rules.
+
+    Can be used as ``@pure`` or ``@pure(maxsize=1024, ttl=60)``.
+    """
+    if func is None:
+        return lambda func: PureCallable(func, maxsize, ttl)
+    return PureCallable(func, maxsize, ttl)
+
+
+def make_pure(callables_dict):
+    return dict(
+        (name, func if isinstance(func, PureCallable) else PureCallable(func))
+        for name, func in callables_dict.items())
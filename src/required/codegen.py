@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+Generate specialised Python source for a :class:`ValidationPlan`.
+
+Field lookups and operators are inlined into one function per field, the
+interpreted plan stays the reference implementation: whenever an inlined
+check fails or raises, the plan's own check is run to produce the exact
+same error.
+"""
+from __future__ import unicode_literals
+
+import six
+import operator
+
+from .expressions import RExpression, R, FieldOp, GenericOp, In, And, Or, Not
+
+BINARY_OPERATORS = {
+    operator.add: "+",
+    operator.sub: "-",
+    operator.mul: "*",
+    operator.pow: "**",
+    FieldOp.div_op: "/",
+}
+
+COMPARISON_OPERATORS = {
+    operator.eq: "==",
+    operator.ne: "!=",
+    operator.lt: "<",
+    operator.le: "<=",
+    operator.gt: ">",
+    operator.ge: ">=",
+}
+
+
+class SourceBuilder(object):
+
+    def __init__(self):
+        self.namespace = {}
+        self.lines = []
+        self._names = {}
+
+    def constant(self, value, prefix="_c"):
+        # constants are bound into the module namespace rather than
+        # rendered with repr, so any object can be used
+        key = id(value)
+        if key not in self._names:
+            name = "%s%d" % (prefix, len(self._names))
+            self._names[key] = name
+            self.namespace[name] = value
+        return self._names[key]
+
+    def emit(self, indent, line):
+        self.lines.append("    " * indent + line)
+
+    def source(self):
+        return "\n".join(self.lines) + "\n"
+
+    def expression(self, node, overrides):
+        """
+        Return a Python expression evaluating ``node`` against ``data``.
+
+        ``overrides`` maps field names to local variable names to read
+        them from instead.
+        """
+        if isinstance(node, R):
+            if isinstance(node.field, FieldOp):
+                return self.expression(node.field, overrides)
+            if node.field in overrides:
+                return overrides[node.field]
+            return "data[%s]" % self.constant(node.field, "_k")
+
+        if isinstance(node, FieldOp):
+            args = [self.operand(arg, overrides, FieldOp) for arg in node.args]
+            symbol = BINARY_OPERATORS.get(node.operator)
+            if symbol is not None and len(args) == 2 and not node.kwargs:
+                return "(%s %s %s)" % (args[0], symbol, args[1])
+            args.extend(
+                "%s=%s" % (name, self.operand(value, overrides, FieldOp))
+                for name, value in sorted(node.kwargs.items()))
+            return "%s(%s)" % (self.constant(node.operator), ", ".join(args))
+
+        if isinstance(node, In):
+            if node._members is not None:
+                return "%s(%s)" % (
+                    self.constant(node.contains_constant),
+                    self.operand(node.field, overrides),
+                )
+            return "%s(%s, %s)" % (
+                self.constant(node.contains),
+                self.operand(node.field, overrides),
+                self.operand(node.values, overrides),
+            )
+
+        if isinstance(node, (And, Or)):
+            # python's own operators keep the short circuit
+            return "(%s %s %s)" % (
+                self.operand(node.lhs, overrides),
+                "and" if isinstance(node, And) else "or",
+                self.operand(node.rhs, overrides),
+            )
+
+        if isinstance(node, Not):
+            return "(not %s)" % self.operand(node.operand, overrides)
+
+        if isinstance(node, GenericOp):
+            lhs = self.operand(node.lhs, overrides)
+            rhs = self.operand(node.rhs, overrides)
+            op = node.get_operator()
+            symbol = COMPARISON_OPERATORS.get(op)
+            if symbol is not None:
+                return "(%s %s %s)" % (lhs, symbol, rhs)
+            return "%s(%s, %s)" % (self.constant(op), lhs, rhs)
+
+        return "%s(data)" % self.constant(node)
+
+    def operand(self, value, overrides, owner=RExpression):
+        # FieldOp only resolves R arguments, expressions also call any
+        # RExpression operand
+        if isinstance(value, R):
+            return self.expression(value, overrides)
+        if owner is not FieldOp and isinstance(value, RExpression):
+            return self.expression(value, overrides)
+        return self.constant(value)
+
+
+class GeneratedPlan(object):
+    """
+    A :class:`ValidationPlan` compiled to Python source.
+
+    ``validate`` raises exactly what ``plan.validate`` raises. The generated
+    source is kept on ``source`` for inspection.
+    """
+
+    def __init__(self, plan):
+        self.plan = plan
+        self._partial_checks = {}
+        builder = SourceBuilder()
+        builder.namespace.update({
+            "_check": plan._check,
+            "_view": plan._view,
+            "_deps": plan.deps,
+            "_partial_checks": self.partial_checks,
+        })
+
+        checks = {}
+        self._dependency_functions = {}
+        fields = sorted(
+            set(plan.graph.edges) | set(plan._partials), key=six.text_type)
+        for index, field in enumerate(fields):
+            name = "_field%d" % index
+            self._field_function(builder, name, field)
+            checks[field] = name
+
+        builder.emit(0, "def validate(data):")
+        if plan._nested:
+            builder.emit(1, "data = _view(data)")
+        else:
+            builder.emit(1, "if type(data) is not dict:")
+            builder.emit(2, "data = _view(data)")
+        builder.emit(1, "get = _fields.get")
+        builder.emit(1, "for field in data:")
+        builder.emit(2, "check = get(field)")
+        builder.emit(2, "if check is not None:")
+        builder.emit(3, "check(data, data[field])")
+
+        self.source = builder.source()
+        namespace = builder.namespace
+        code = compile(self.source, "<required.codegen>", "exec", dont_inherit=True)
+        six.exec_(code, namespace)
+        namespace["_fields"] = dict(
+            (field, namespace[name]) for field, name in checks.items())
+        for dep, name in self._dependency_functions.items():
+            self._dependency_functions[dep] = namespace[name]
+        self.validate = namespace["validate"]
+
+    def _field_function(self, builder, name, field):
+        field_name = builder.constant(field, "_k")
+        deps = self.plan.graph.edges.get(field, ())
+        partials = self.plan._partials.get(field, ())
+
+        builder.emit(0, "def %s(data, value):" % name)
+        if partials:
+            overrides = {field: "value"}
+            conditions = ", ".join(
+                "bool(%s)" % builder.expression(condition, overrides)
+                for condition, _ in partials)
+            builder.emit(1, "try:")
+            builder.emit(2, "triggered = (%s, )" % conditions)
+            builder.emit(1, "except Exception:")
+            builder.emit(2, "_deps(%s, value)" % field_name)
+            builder.emit(2, "raise")
+
+        for dep in deps:
+            self._check_source(builder, 1, field_name, dep)
+
+        if partials:
+            builder.emit(1, "if any(triggered):")
+            builder.emit(2, "for check in _partial_checks(%s, triggered):" % field_name)
+            builder.emit(3, "check(%s, data)" % field_name)
+        builder.emit(1, "return")
+        builder.emit(0, "")
+
+        for _, entries in partials:
+            for dep in entries:
+                self._dependency_function(builder, dep)
+
+    def _dependency_function(self, builder, dep):
+        if dep in self._dependency_functions:
+            return
+        name = "_dep%d" % len(self._dependency_functions)
+        self._dependency_functions[dep] = name
+        builder.emit(0, "def %s(field, data):" % name)
+        self._check_source(builder, 1, "field", dep)
+        builder.emit(0, "")
+
+    def _check_source(self, builder, indent, field_name, dep):
+        dependency = builder.constant(dep, "_d")
+        emit = builder.emit
+        emit(indent, "if %s not in data:" % builder.constant(dep.name, "_k"))
+        emit(indent + 1, "_check(%s, %s, data)" % (field_name, dependency))
+        if dep.expression is None:
+            return
+        emit(indent, "try:")
+        emit(indent + 1, "valid = %s" % builder.expression(dep.expression, {}))
+        emit(indent, "except Exception:")
+        emit(indent + 1, "valid = False")
+        emit(indent, "if not valid:")
+        emit(indent + 1, "_check(%s, %s, data)" % (field_name, dependency))
+
+    def partial_checks(self, field, triggered):
+        key = (field, triggered)
+        checks = self._partial_checks.get(key)
+        if checks is None:
+            plan = self.plan
+            deps = plan.graph.edges.get(field, ())
+            entries = [
+                entries for (_, entries), fired
+                in zip(plan._partials[field], triggered) if fired
+            ]
+            checks = self._partial_checks[key] = tuple(
+                self._dependency_functions[dep]
+                for dep in plan._expand(deps, entries)[len(deps):])
+        return checks
+
+
+def generate(requires):
+    """
+    Compile ``requires`` into a :class:`GeneratedPlan`.
+    """
+    return GeneratedPlan(requires.compile())
@@ -2,42 +2,180 @@
 from __future__ import unicode_literals
 
 import six
+import sys
 import inspect
+import threading
 
 from .requires import Requires
-from .dsl import build_requirements_factory as default_build_requirements_factory, init_transformer, init_parser
-from .exceptions import DecoratorError
+from .dsl import build_requirements_factory as default_build_requirements_factory, init_transformer, lazy_parser
+from .exceptions import DecoratorError, RequiredSyntaxError
+from .callables import make_pure
+
+if sys.version_info >= (3, 5):
+    from .aio import async_validate_wrapper
+else:  # pragma: no cover
+    async_validate_wrapper = None
+
+# Module wide default for Validate(lazy=None). When True, docstrings are
+# only parsed the first time the decorated function is called.
+LAZY = False
+
+_pending = []
+_pending_lock = threading.Lock()
+
+
+class LazyPlan(object):
+    """
+    Defers building the validation plan of a docstring until first use.
+    """
+
+    def __init__(self, build, func):
+        self.build = build
+        self.func = func
+        self._plan = None
+        with _pending_lock:
+            _pending.append(self)
+
+    def compile(self):
+        plan = self._plan
+        if plan is None:
+            plan = self._plan = self.build().compile()
+            with _pending_lock:
+                if self in _pending:
+                    _pending.remove(self)
+        return plan
+
+    @property
+    def name(self):
+        func = self.func
+        return "%s.%s" % (
+            func.__module__, getattr(func, "__qualname__", func.__name__))
+
+    def validate(self, data):
+        return self.compile().validate(data)
+
+    def avalidate(self, data):
+        return self.compile().avalidate(data)
+
+
+def warmup():
+    """
+    Compile the rules of every lazily decorated function that hasn't been
+    called yet, so syntax errors surface now rather than on first call.
+
+    Every pending function is compiled, then a :class:`RequiredSyntaxError`
+    naming each one whose rules failed is raised. Returns the number of
+    functions compiled.
+    """
+    with _pending_lock:
+        pending = list(_pending)
+
+    failures = []
+    for lazy_plan in pending:
+        try:
+            lazy_plan.compile()
+        except Exception as e:
+            failures.append("%s: %s" % (lazy_plan.name, e))
+    if failures:
+        raise RequiredSyntaxError(
+            "rules of %d function(s) failed to compile\n%s" % (
+                len(failures), "\n".join(failures)))
+    return len(pending)
+
+
+def argument_layout(func):
+    """
+    Return the positional argument names of ``func``, followed by
+    ``(name, default)`` pairs for its positional and keyword only arguments
+    with default values.
+    """
+    if six.PY3:
+        fullargspec = inspect.getfullargspec(func)
+        arg_names = tuple(fullargspec.args or ())
+        defaults = fullargspec.defaults or ()
+        kwonly_defaults = fullargspec.kwonlydefaults or {}
+    else:
+        argspec = inspect.getargspec(func)
+        arg_names = tuple(argspec.args or ())
+        defaults = argspec.defaults or ()
+        kwonly_defaults = {}
+
+    defaulted = arg_names[len(arg_names) - len(defaults):]
+    return arg_names, tuple(zip(defaulted, defaults)), tuple(kwonly_defaults.items())
 
 
 class Validate(object):
 
-    def __init__(self, callables_dict=None, build_requirements_factory=None):
+    def __init__(self, callables_dict=None, build_requirements_factory=None, lazy=None):
         self.callables_dict = callables_dict or {}
         self.build_requirements_factory = build_requirements_factory or default_build_requirements_factory
-        self.requirements_builder = self.build_requirements_factory(
-            init_parser(),
-            init_transformer(callables_dict)
-        )
+        self.lazy = lazy
+        self._requirements_builder = None
+
+    @property
+    def requirements_builder(self):
+        # the grammar is only compiled once a docstring misses the cache and
+        # any loaded bundle
+        if self._requirements_builder is None:
+            self._requirements_builder = self.build_requirements_factory(
+                lazy_parser,
+                init_transformer(self.callables_dict)
+            )
+        return self._requirements_builder
 
     def _inherit_callables_dict(self, callables_dict):
         new_callables_dict = callables_dict.copy()
         new_callables_dict.update(self.callables_dict)
         return new_callables_dict
 
-    def register_callables(self, callables_dict):
-        return Validate(self._inherit_callables_dict(callables_dict), self.build_requirements_factory)
+    def _is_lazy(self, lazy):
+        if lazy is not None:
+            return lazy
+        if self.lazy is not None:
+            return self.lazy
+        return LAZY
+
+    def register_callables(self, callables_dict, lazy=None, pure=False):
+        """
+        Return a new ``Validate`` with ``callables_dict`` added to the
+        callables available to rules.
+
+        With ``pure=True`` the callables are treated as side effect free and
+        their results are cached, see :func:`required.pure`.
+        """
+        if pure:
+            callables_dict = make_pure(callables_dict)
+        return Validate(
+            self._inherit_callables_dict(callables_dict),
+            self.build_requirements_factory,
+            self.lazy if lazy is None else lazy,
+        )
+
+    def _build_requires(self, docstring, callables_dict):
+        requirements_builder = None
+        if callables_dict:
+            requirements_builder = self.build_requirements_factory(
+                lazy_parser,
+                init_transformer(self._inherit_callables_dict(callables_dict))
+            )
+
+        requirements_builder = requirements_builder or self.requirements_builder
+        return requirements_builder(
+            docstring,
+        )
 
-    def __call__(self, arg=None, callables_dict=None):
+    def __call__(self, arg=None, callables_dict=None, lazy=None):
 
-        if callables_dict is not None and arg is None:
-            # called with validate(callable_dict=...)
-            return self.register_callables(callables_dict)
+        if arg is None and (callables_dict is not None or lazy is not None):
+            # called with validate(callable_dict=...) or validate(lazy=...)
+            return self.register_callables(callables_dict or {}, lazy)
 
         if arg is None:
             raise DecoratorError('Error, arg must be provided if callables_dict is None')
 
+        rules = None
         if isinstance(arg, Requires):
-            requires = arg
+            plan = arg.compile()
             func = None
         else:
             func = arg
@@ -46,37 +184,49 @@ class Validate(object):
             if not docstring:
                 raise DecoratorError("If function doesn't have a docstring, you must pass a requires object explicitly")
 
-            requirements_builder = None
-            if callables_dict:
-                requirements_builder = self.build_requirements_factory(
-                    init_parser(),
-                    init_transformer(self._inherit_callables_dict(callables_dict))
-                )
+            # lets ``python -m required precompile`` find the rules
+            rules = (docstring, self._inherit_callables_dict(callables_dict or {}))
 
-            requirements_builder = requirements_builder or self.requirements_builder
-            requires = requirements_builder(
-                docstring,
-            )
+            if self._is_lazy(lazy):
+                plan = LazyPlan(
+                    lambda: self._build_requires(docstring, callables_dict),
+                    func,
+                )
+            else:
+                plan = self._build_requires(docstring, callables_dict).compile()
 
         def validate_decorator(func):
-            if six.PY3:
-                fullargspec = inspect.getfullargspec(func)
-                inspected_args = fullargspec.args or ()
-                inspected_defaults = fullargspec.defaults or ()
-                inspected_kwonlyargs_defaults = fullargspec.kwonlydefaults or {}
+            arg_names, defaults, kwonly_defaults = argument_layout(func)
+            # positional defaults are only needed when fewer positional
+            # arguments than parameters are passed
+            all_positional = len(arg_names)
+
+            def bind_arguments(args, kwargs):
+                arguments = dict(zip(arg_names, args))
+                if kwargs:
+                    arguments.update(kwargs)
+                if defaults and len(args) < all_positional:
+                    for name, default in defaults:
+                        if name not in arguments:
+                            arguments[name] = default
+                if kwonly_defaults:
+                    for name, default in kwonly_defaults:
+                        if name not in arguments:
+                            arguments[name] = default
+                return arguments
+
+            if async_validate_wrapper is not None and inspect.iscoroutinefunction(func):
+                func_wrapper = async_validate_wrapper(func, bind_arguments, plan)
             else:
-                argspec = inspect.getargspec(func)
-                inspected_args = argspec.args or ()
-                inspected_defaults = argspec.defaults or ()
-                inspected_kwonlyargs_defaults = {}
-
-            @six.wraps(func)
-            def func_wrapper(*args, **kwargs):
-                args_as_dict = dict(zip(inspected_args, args + inspected_defaults))
-                args_as_dict.update(inspected_kwonlyargs_defaults)
-                args_as_dict.update(kwargs)
-                requires.validate(args_as_dict)
-                return func(*args, **kwargs)
+                validate_arguments = plan.validate
+
+                @six.wraps(func)
+                def func_wrapper(*args, **kwargs):
+                    validate_arguments(bind_arguments(args, kwargs))
+                    return func(*args, **kwargs)
+
+            if rules is not None:
+                func_wrapper._required_rules = rules
             return func_wrapper
 
         return validate_decorator(func) if func is not None else validate_decorator
@@ -1,15 +1,21 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+import re
 import operator
+import functools
+import itertools
+import threading
 
 from os import path
-from six.moves import reduce
+from collections import OrderedDict, namedtuple
 
 from lark import Lark, Transformer, v_args
+from lark.exceptions import VisitError
 
+from . import bundle, instrumentation
 from .requires import Requires
-from .expressions import R, Func
+from .expressions import R, Func, And, Or, Not
 from .exceptions import RequiredSyntaxError
 
 
@@ -20,10 +26,46 @@ def read_grammer_file(filename='grammer.lark'):
         return f.read()
 
 
-def init_parser():
-    grammer = read_grammer_file()
-    parser = Lark(grammer)
-    return parser
+# rules can be embedded in other docstring content inside a "Requires { }"
+# block, braces inside of string literals or comments do not close the block.
+REQUIRES_BLOCK = re.compile(
+    r'Requires \{((?:"(?:[^"\\]|\\.)*"|#[^\n]*|[^"#}])*)\}')
+
+_parser = None
+
+
+def init_parser(cache=False):
+    """
+    Return the process wide LALR parser for the requires grammar.
+
+    The grammar is only read and compiled on the first call. ``cache`` is
+    passed through to ``Lark`` so the compiled grammar can be stored on disk
+    and reused by later processes; it is either ``True`` or a filename.
+    """
+    global _parser
+    if _parser is None:
+        _parser = Lark(read_grammer_file(), parser="lalr", cache=cache)
+    return _parser
+
+
+class LazyParser(object):
+    """
+    Stands in for the parser returned by :func:`init_parser`, which is only
+    built the first time rules are actually parsed.
+    """
+
+    def parse(self, text):
+        return init_parser().parse(text)
+
+
+lazy_parser = LazyParser()
+
+
+def extract_rules(text):
+    match = REQUIRES_BLOCK.search(text)
+    if match is None:
+        return text
+    return match.group(1)
 
 
 @v_args(inline=True)
@@ -37,7 +79,11 @@ class TreeToRequiresTransformer(Transformer, object):
         return R(var.value)
 
     def number_expression(self, var):
-        return float(var.value)
+        # integer literals stay ints, so rules equal those built in Python
+        try:
+            return int(var.value)
+        except ValueError:
+            return float(var.value)
 
     def func_expression(self, func):
         return func
@@ -86,24 +132,155 @@ class TreeToRequiresTransformer(Transformer, object):
     def var_comparison(self, var):
         return R(var.value)
 
+    def or_test(self, *operands):
+        return functools.reduce(Or, operands)
+
+    def and_test(self, *operands):
+        return functools.reduce(And, operands)
+
+    def not_test(self, operand):
+        return Not(operand)
+
     def rule(self, lhs, rhs):
+        fields = lhs.get_fields()
+        if len(fields) > 1:
+            raise RequiredSyntaxError(
+                "the condition of a rule must read a single field, not %s" %
+                ", ".join(sorted(fields)))
         return Requires(lhs, rhs)
 
     def statement(self, *rules):
-        return reduce(operator.add, rules)
+        return rules
 
-    def start(self, *rules):
-        return reduce(operator.add, rules)
+    def start(self, *statements):
+        return Requires.combine(itertools.chain.from_iterable(statements))
 
 
 def init_transformer(callables_dict):
     return TreeToRequiresTransformer(callables_dict)
 
 
-def build_requirements_factory(parser, transformer):
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class RequirementsCache(object):
+    """
+    Bounded LRU cache of compiled :class:`Requires` objects.
+
+    Entries are keyed on the normalized rule text and the callables in scope,
+    so identical rule blocks are only parsed and transformed once. A
+    ``maxsize`` of ``None`` makes the cache unbounded.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries[key] = value
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = value
+            self._evict()
+
+    def _evict(self):
+        if self.maxsize is None:
+            return
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def resize(self, maxsize):
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+
+requirements_cache = RequirementsCache()
+
+
+INLINE_WHITESPACE = re.compile(r'("(?:[^"\\]|\\.)*")|[\t ]+')
+
+
+def normalize_rules(text):
+    # runs of inline whitespace outside of string literals and blank lines
+    # are insignificant to the grammar
+    lines = (
+        INLINE_WHITESPACE.sub(lambda m: m.group(1) or " ", line).strip()
+        for line in extract_rules(text).splitlines()
+    )
+    return "\n".join(line for line in lines if line)
+
+
+def callables_key(callables_dict):
+    return tuple(sorted(
+        (name, id(func)) for name, func in callables_dict.items()))
+
+
+def transform(parser, transformer, rules):
+    try:
+        return transformer.transform(parser.parse(rules))
+    except VisitError as e:
+        # lark wraps errors raised by the transformer
+        if isinstance(e.orig_exc, RequiredSyntaxError):
+            raise e.orig_exc
+        raise
+
+
+def build_requirements_factory(parser, transformer, cache=requirements_cache):
+    def build(rules):
+        hook = instrumentation.hook
+        if hook is None:
+            return transform(parser, transformer, rules)
+        start = instrumentation.clock()
+        requires = transform(parser, transformer, rules)
+        hook.parse(rules, instrumentation.clock() - start)
+        return requires
+
+    callables_dict = getattr(transformer, "function_whitelist_lookup", None)
+    # the cache and bundles hold what the shared parser builds, rules read
+    # by any other parser are always parsed
+    shared = parser is lazy_parser or parser is _parser
+    if cache is None or callables_dict is None or not shared:
+        def inner(text):
+            return build(extract_rules(text))
+        return inner
+
+    # bundles hold what the default transformer would build
+    bundled = type(transformer) is TreeToRequiresTransformer
+
     def inner(text):
-        parse_tree = parser.parse(text)
-        return transformer.transform(parse_tree)
+        rules = normalize_rules(text)
+        key = (type(transformer), rules, callables_key(callables_dict))
+        requires = cache.get(key)
+        if requires is None:
+            if bundled and bundle.bundles:
+                requires = bundle.bundles.get(rules, callables_dict)
+            if requires is None:
+                requires = build(rules)
+            cache.set(key, requires)
+        return requires
     return inner
 
 
@@ -111,4 +288,6 @@ __all__ = [
     "build_requirements_factory",
     "init_parser",
     "init_transformer",
+    "requirements_cache",
+    "RequirementsCache",
 ]
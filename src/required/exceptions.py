@@ -31,3 +31,7 @@ class RequirementError(BaseRequiredError):
 
 class DecoratorError(BaseRequiredError):
     pass
+
+
+class BundleError(BaseRequiredError):
+    pass
@@ -2,48 +2,155 @@
 from __future__ import unicode_literals
 
 import six
+import weakref
 import operator
+import threading
 
 from .exceptions import ResolveError
-
-
+from . import accessors
+
+_interned = weakref.WeakValueDictionary()
+_intern_lock = threading.Lock()
+
+# shared by every FieldOp called without keyword arguments, never mutated
+_no_kwargs = {}
+
+
+def structural_key(value):
+    """
+    Return a hashable key identifying ``value`` by structure.
+
+    Expression nodes are interned, so their identity stands for their whole
+    subtree. Other constants are keyed with their type, so ``1``, ``1.0``
+    and ``True`` stay distinct. Raises ``TypeError`` for unhashable
+    constants.
+    """
+    value_type = type(value)
+    if isinstance(value_type, Interned):
+        return id(value)
+    if value_type is six.text_type:
+        # field names, the most common constant, are keyed as themselves
+        return value
+    if value_type is list or value_type is tuple:
+        return (value_type, tuple(map(structural_key, value)))
+    hash(value)
+    return (value_type, value)
+
+
+class Interned(type):
+    """
+    Hash-conses instances: constructing a node with the same class and
+    arguments as a live node returns that node, so structurally equal
+    expressions are the same object and compare by identity.
+    """
+
+    def __call__(cls, *args, **kwargs):
+        try:
+            key = (cls, ) + tuple(map(structural_key, args))
+            if kwargs:
+                key += tuple(sorted(
+                    (name, structural_key(value)) for name, value in kwargs.items()))
+        except TypeError:
+            # unhashable constants, e.g. dicts, can't be shared
+            return super(Interned, cls).__call__(*args, **kwargs)
+
+        node = _interned.get(key)
+        if node is None:
+            node = super(Interned, cls).__call__(*args, **kwargs)
+            with _intern_lock:
+                node = _interned.setdefault(key, node)
+        return node
+
+
+@six.add_metaclass(Interned)
 class RExpression(object):
+    # subclasses declare their own __slots__ so nodes carry no __dict__,
+    # __weakref__ is needed for the intern table
+    __slots__ = ("__weakref__", )
+
     def error(self, key, key_dep, data):
         raise NotImplementedError
 
     def get_fields(self):
         raise NotImplementedError
 
-    def _resolve(self, val, data):
+    def _resolve(self, val, data, memo=None):
         if isinstance(val, R):
-            return val._resolve(data)
+            return val._resolve(data, memo)
         if isinstance(val, RExpression):
-            return val(data)
+            if memo is None:
+                return val(data)
+            return val.evaluate(data, memo)
         return val
 
+    def evaluate(self, data, memo):
+        """
+        Return ``self(data)``, reusing the result stored in ``memo`` when
+        this expression has already been evaluated against ``data``.
+        """
+        key = id(self)
+        value = memo.get(key, memo)
+        if value is memo:
+            value = memo[key] = self(data, memo)
+        return value
+
+    # nodes are interned, identity is structural equality
     def __hash__(self):
-        raise NotImplementedError
+        return id(self)
 
     def __eq__(self, other):
-        return hash(self) == hash(other)
+        return self is other
+
+    def __ne__(self, other):
+        return self is not other
 
 
 class In(RExpression):
+    __slots__ = ("field", "values", "_members")
+
     def __init__(self, field, values):
         self.field = field
         self.values = values
+        self._members = self.members(values)
 
-    def __call__(self, data):
-        field = self._resolve(self.field, data)
-        values = self._resolve(self.values, data)
+    @staticmethod
+    def members(values):
+        # constant list and tuple containers are hashed once up front
+        # rather than scanned on every check
+        if isinstance(values, (list, tuple)):
+            try:
+                return frozenset(values)
+            except TypeError:
+                pass
+        return None
+
+    def __call__(self, data, memo=None):
+        field = self._resolve(self.field, data, memo)
+        if self._members is not None:
+            return self.contains_constant(field)
+        values = self._resolve(self.values, data, memo)
+        return self.contains(field, values)
+
+    def contains_constant(self, field):
+        members = self._members
+        if isinstance(field, (list, tuple)):
+            return not members.isdisjoint(field)
+        try:
+            return field in members
+        except TypeError:
+            # unhashable values are compared with == like list.__contains__
+            return field in self.values
+
+    @staticmethod
+    def contains(field, values):
         if isinstance(field, list) or isinstance(field, tuple):
-            return not set(field).isdisjoint(set(values))
+            return not set(field).isdisjoint(values)
         return field in values
 
     def get_fields(self):
         fields = set()
         for item in (self.field, self.values):
-            if isinstance(item, R):
+            if isinstance(item, (R, RExpression)):
                 for field in item.get_fields():
                     fields.add(field)
         return fields
@@ -57,13 +164,9 @@ class In(RExpression):
         return "{key} requires {dep} to be either {values}".format(
             key=key, dep=dep, values=" or ".join(map(str, values)))
 
-    def __hash__(self):
-        if isinstance(self.values, R):
-            return hash(hash(self.field) + hash(self.values))
-        return hash(hash(self.field) + sum(map(hash, self.values)))
-
 
 class GenericOp(RExpression):
+    __slots__ = ("lhs", "rhs")
 
     op = None
     error_msg = None
@@ -75,9 +178,9 @@ class GenericOp(RExpression):
     def get_operator(self):
         return self.op
 
-    def __call__(self, data):
-        lhs_value = self._resolve(self.lhs, data)
-        rhs_value = self._resolve(self.rhs, data)
+    def __call__(self, data, memo=None):
+        lhs_value = self._resolve(self.lhs, data, memo)
+        rhs_value = self._resolve(self.rhs, data, memo)
         return self.get_operator()(lhs_value, rhs_value)
 
     def error(self, key, dep_key, data):
@@ -88,72 +191,126 @@ class GenericOp(RExpression):
     def get_fields(self):
         fields = set()
         for item in (self.lhs, self.rhs):
-            if isinstance(item, R):
+            if isinstance(item, (R, RExpression)):
                 for field in item.get_fields():
                     fields.add(field)
         return fields
 
-    def __hash__(self):
-        return hash(self.lhs) + hash(self.rhs) + hash(self.get_operator())
-
     def __and__(self, other):
         return And(self, other)
 
     def __or__(self, other):
         return Or(self, other)
 
+    def __invert__(self):
+        return Not(self)
+
 
 class And(GenericOp):
+    __slots__ = ()
 
     @staticmethod
     def op(lhs_value, rhs_value):
         return lhs_value and rhs_value
 
+    def __call__(self, data, memo=None):
+        # the rhs is only resolved when the lhs doesn't decide the result
+        lhs_value = self._resolve(self.lhs, data, memo)
+        if not lhs_value:
+            return lhs_value
+        return self._resolve(self.rhs, data, memo)
+
     error_msg = "{key} requires {dep} and {value} to be true"
 
 
 class Or(GenericOp):
+    __slots__ = ()
 
     @staticmethod
     def op(lhs_value, rhs_value):
         return lhs_value or rhs_value
 
+    def __call__(self, data, memo=None):
+        lhs_value = self._resolve(self.lhs, data, memo)
+        if lhs_value:
+            return lhs_value
+        return self._resolve(self.rhs, data, memo)
+
     error_msg = "{key} requires {dep} or {value} to be true"
 
 
+class Not(RExpression):
+    __slots__ = ("operand", )
+
+    def __init__(self, operand):
+        self.operand = operand
+
+    def __call__(self, data, memo=None):
+        return not self._resolve(self.operand, data, memo)
+
+    def get_fields(self):
+        if isinstance(self.operand, (R, RExpression)):
+            return self.operand.get_fields()
+        return set()
+
+    def error(self, key, dep_key, data):
+        dep = self.operand.error() if isinstance(self.operand, R) else self.operand
+        return "{key} requires {dep} to be false".format(key=key, dep=dep)
+
+    def __and__(self, other):
+        return And(self, other)
+
+    def __or__(self, other):
+        return Or(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+
 class Lte(GenericOp):
+    __slots__ = ()
     op = operator.le
     error_msg = "{key} requires {dep} to be less than or equal to {value}"
 
 
 class Gte(GenericOp):
+    __slots__ = ()
     op = operator.ge
     error_msg = "{key} requires {dep} to be greater than or equal to {value}"
 
 
 class Eq(GenericOp):
+    __slots__ = ()
     op = operator.eq
     error_msg = "{key} requires {dep} to be equal to {value}"
 
 
 class Lt(GenericOp):
+    __slots__ = ()
     op = operator.lt
     error_msg = "{key} requires {dep} to be less than {value}"
 
 
 class Gt(GenericOp):
+    __slots__ = ()
     op = operator.gt
     error_msg = "{key} requires {dep} to be greater than {value}"
 
 
 class NotEq(GenericOp):
+    __slots__ = ()
     op = operator.ne
     error_msg = "{key} requires {dep} not be {value}"
 
 
+@six.add_metaclass(Interned)
 class R(object):
+    __slots__ = ("field", "path", "__weakref__")
+
     def __init__(self, field):
         self.field = field
+        # dotted fields are compiled once, not split on every lookup
+        self.path = accessors.path(field) if accessors.is_path(field) else None
 
     def get_fields(self):
         if isinstance(self.field, FieldOp):
@@ -165,12 +322,19 @@ class R(object):
             return "({error})".format(error=self.field.error())
         return self.field
 
-    def _resolve(self, data):
+    def _resolve(self, data, memo=None):
         try:
             if isinstance(self.field, FieldOp):
-                return self.field._resolve(data)
+                if memo is None:
+                    return self.field._resolve(data)
+                return self.field.evaluate(data, memo)
             return data[self.field]
         except KeyError:
+            if self.path is not None:
+                try:
+                    return self.path(data)
+                except KeyError:
+                    pass
             raise ResolveError(self.field,
                                'missing key %s in data' % self.field)
 
@@ -226,10 +390,12 @@ class R(object):
         return R(fieldop)
 
     def __hash__(self):
-        return hash(self.field)
+        return id(self)
 
 
+@six.add_metaclass(Interned)
 class FieldOp(object):
+    __slots__ = ("operator", "args", "kwargs", "__weakref__")
 
     div_op = operator.div if six.PY2 else operator.truediv
 
@@ -244,7 +410,7 @@ class FieldOp(object):
     def __init__(self, operator, *args, **kwargs):
         self.operator = operator
         self.args = args
-        self.kwargs = kwargs
+        self.kwargs = kwargs or _no_kwargs
 
     def get_fields(self):
         fields = set()
@@ -254,20 +420,28 @@ class FieldOp(object):
                     fields.add(field)
         return fields
 
-    def _resolve_arg(self, arg, data):
+    def _resolve_arg(self, arg, data, memo=None):
         if isinstance(arg, R):
-            return arg._resolve(data)
+            return arg._resolve(data, memo)
         return arg
 
-    def _resolve(self, data):
+    def _resolve(self, data, memo=None):
         resolved_args = tuple(
-            (self._resolve_arg(arg, data) for arg in self.args))
+            (self._resolve_arg(arg, data, memo) for arg in self.args))
         resolved_kwargs = {
-            key: self._resolve_arg(value, data)
+            key: self._resolve_arg(value, data, memo)
             for key, value in self.kwargs.items()
         }
         return self.operator(*resolved_args, **resolved_kwargs)
 
+    def evaluate(self, data, memo):
+        # a callable shared by several rules is only called once per memo
+        key = id(self)
+        value = memo.get(key, memo)
+        if value is memo:
+            value = memo[key] = self._resolve(data, memo)
+        return value
+
     def error(self):
         if len(self.args) == 2:
             lhs = self.args[0]
@@ -290,7 +464,7 @@ class FieldOp(object):
         return arg.error() if isinstance(arg, R) else arg
 
     def __hash__(self):
-        return hash(self.operator) + sum(map(hash, self.args))
+        return id(self)
 
 
 def Func(func, *args, **kwargs):
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+The full dependency graph of a :class:`Requires` and the indexes built
+from it.
+
+Every traversal here is iterative, so long chains of fields don't hit the
+recursion limit.
+"""
+from __future__ import unicode_literals
+
+from collections import defaultdict
+
+import six
+
+from .expressions import R, FieldOp, GenericOp, In, Not
+from .accessors import is_path
+
+
+class DependencyGraph(object):
+    """
+    Full dependencies indexed by source field, in the order they were
+    declared.
+    """
+
+    def __init__(self, edges):
+        self.edges = edges
+
+
+def read_fields(value):
+    """
+    Return the fields ``value`` reads, like ``get_fields`` but including
+    keyword arguments of callables.
+    """
+    fields = set()
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, R):
+            if isinstance(value.field, FieldOp):
+                stack.append(value.field)
+            else:
+                fields.add(value.field)
+        elif isinstance(value, FieldOp):
+            stack.extend(value.args)
+            stack.extend(value.kwargs.values())
+        elif isinstance(value, In):
+            stack.extend((value.field, value.values))
+        elif isinstance(value, Not):
+            stack.append(value.operand)
+        elif isinstance(value, GenericOp):
+            stack.extend((value.lhs, value.rhs))
+    return fields
+
+
+class ReverseIndex(object):
+    """
+    Maps a field to the dependencies that read it, either by requiring it
+    or through their expression, and a dependency back to the fields that
+    declare it.
+    """
+
+    def __init__(self, graph, partials):
+        owners = defaultdict(list)
+        partial_owners = defaultdict(list)
+        for field, deps in graph.edges.items():
+            for dep in deps:
+                owners[dep].append(field)
+        for field, entries in partials.items():
+            for condition, dependencies in entries:
+                for dep in dependencies:
+                    partial_owners[dep].append((field, condition))
+
+        readers = defaultdict(set)
+        for dep in set(owners).union(partial_owners):
+            readers[dep.name].add(dep)
+            if dep.expression is not None:
+                for field in read_fields(dep.expression):
+                    readers[field].add(dep)
+
+        self._readers = dict(readers)
+        self._owners = dict(owners)
+        self._partial_owners = dict(partial_owners)
+        # a change to a path changes the paths above and below it too
+        self._paths = set(
+            field for field in set(readers).union(graph.edges, partials)
+            if isinstance(field, six.string_types))
+        if not any(is_path(field) for field in self._paths):
+            self._paths = None
+
+    def related(self, fields):
+        """
+        Return ``fields`` with the known paths above or below any of them,
+        changing ``address`` changes ``address.postcode`` and the other way
+        round.
+        """
+        related = set(fields)
+        if self._paths is None:
+            return related
+        for field in list(related):
+            if not isinstance(field, six.string_types):
+                continue
+            prefix = field + "."
+            for path in self._paths:
+                if path.startswith(prefix) or field.startswith(path + "."):
+                    related.add(path)
+        return related
+
+    def readers(self, fields):
+        """
+        Return the dependencies reading any of ``fields``.
+        """
+        deps = set()
+        for field in fields:
+            deps.update(self._readers.get(field, ()))
+        return deps
+
+    def source(self, dependency, data):
+        """
+        Return a field of ``data`` that declares ``dependency``, or ``None``
+        when the dependency doesn't apply to ``data``.
+        """
+        for field in self._owners.get(dependency, ()):
+            if field in data:
+                return field
+        for field, condition in self._partial_owners.get(dependency, ()):
+            if field in data and condition({field: data[field]}):
+                return field
+        return None
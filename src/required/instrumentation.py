@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentation of validation, parsing and compiling.
+
+Nothing is measured until a hook is installed with :func:`install`; while
+no hook is installed the only cost is a check of the module level ``hook``.
+"""
+from __future__ import unicode_literals
+
+import threading
+
+from collections import deque, namedtuple
+from timeit import default_timer as clock
+
+hook = None
+
+
+def install(new_hook):
+    """
+    Install ``new_hook``, an :class:`Instrumentation`, process wide.
+    Returns the previously installed hook.
+    """
+    global hook
+    previous, hook = hook, new_hook
+    return previous
+
+
+def uninstall():
+    return install(None)
+
+
+class Instrumentation(object):
+    """
+    Hook interface, every method is a no-op so subclasses only implement
+    what they need. Times are in seconds.
+    """
+
+    def rule(self, field, dependency, seconds, error):
+        """
+        Called after ``dependency`` of ``field`` was checked, ``error`` is
+        the exception raised, usually a :class:`RequirementError`, or
+        ``None``.
+        """
+
+    def validation(self, seconds, error):
+        """
+        Called after a whole mapping was validated.
+        """
+
+    def parse(self, rules, seconds):
+        """
+        Called after the DSL ``rules`` were parsed and transformed.
+        """
+
+    def compile(self, requires, seconds):
+        """
+        Called after ``requires`` was compiled to a plan.
+        """
+
+
+RuleStat = namedtuple("RuleStat", [
+    "field", "dependency", "expression", "calls", "failures", "total",
+    "p50", "p90", "p99",
+])
+
+
+def percentile(samples, q):
+    if not samples:
+        return None
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class RuleStats(Instrumentation):
+    """
+    Collects counts, failures and timings per rule, plus parse and compile
+    timings, ready to be scraped with :meth:`rules`.
+
+    Percentiles are computed over the last ``samples`` timings of a rule.
+    """
+
+    def __init__(self, samples=1000):
+        self.samples = samples
+        self.validations = 0
+        self.validation_failures = 0
+        self.validation_time = 0.0
+        self.parses = 0
+        self.parse_time = 0.0
+        self.compiles = 0
+        self.compile_time = 0.0
+        self._rules = {}
+        self._lock = threading.Lock()
+
+    def rule(self, field, dependency, seconds, error):
+        key = (field, dependency)
+        with self._lock:
+            entry = self._rules.get(key)
+            if entry is None:
+                entry = self._rules[key] = [0, 0, 0.0, deque(maxlen=self.samples)]
+            entry[0] += 1
+            if error is not None:
+                entry[1] += 1
+            entry[2] += seconds
+            entry[3].append(seconds)
+
+    def validation(self, seconds, error):
+        with self._lock:
+            self.validations += 1
+            if error is not None:
+                self.validation_failures += 1
+            self.validation_time += seconds
+
+    def parse(self, rules, seconds):
+        with self._lock:
+            self.parses += 1
+            self.parse_time += seconds
+
+    def compile(self, requires, seconds):
+        with self._lock:
+            self.compiles += 1
+            self.compile_time += seconds
+
+    def rules(self):
+        """
+        Return a :class:`RuleStat` per rule, the most expensive first.
+        """
+        with self._lock:
+            entries = [
+                (key, entry[:3], sorted(entry[3]))
+                for key, entry in self._rules.items()
+            ]
+        stats = [
+            RuleStat(field, dependency.name, dependency.expression,
+                     calls, failures, total,
+                     percentile(samples, 0.5), percentile(samples, 0.9),
+                     percentile(samples, 0.99))
+            for (field, dependency), (calls, failures, total), samples in entries
+        ]
+        return sorted(stats, key=lambda stat: stat.total, reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self.validations = self.validation_failures = 0
+            self.parses = self.compiles = 0
+            self.validation_time = self.parse_time = self.compile_time = 0.0
+            self._rules.clear()
+
+
+def timed_check(check, field, dependency, data, memo, rule_hook):
+    start = clock()
+    try:
+        check(field, dependency, data, memo)
+    except Exception as e:
+        rule_hook(field, dependency, clock() - start, e)
+        raise
+    rule_hook(field, dependency, clock() - start, None)
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import sys
+
+from . import instrumentation
+from .graph import ReverseIndex, read_fields
+from .accessors import Mapping, Record, is_path
+from .exceptions import RequirementError, ResolveError
+
+if sys.version_info >= (3, 5):
+    from . import aio
+else:  # pragma: no cover
+    aio = None
+
+
+class ValidationPlan(object):
+    """
+    A flattened, read only form of a :class:`Requires` graph.
+
+    ``graph`` is the :class:`DependencyGraph` of full dependencies, each
+    field is checked against the dependencies it declares, in the order
+    ``Requires.deps`` returns them. A dependency that is itself present is
+    checked as a field in turn, so closures never need to be followed.
+    ``partials`` maps a field to ``(condition, dependencies)`` entries which
+    only apply when the condition holds for the value of the field.
+    """
+
+    def __init__(self, graph, partials):
+        self.graph = graph
+        self._edges = graph.edges
+        self._partials = partials
+        # fields with any rules, in the order they were added
+        self._sources = tuple(graph.edges) + tuple(
+            field for field in partials if field not in graph.edges)
+        self._fields = frozenset(self._sources)
+        self._reverse = None
+        # dotted paths can't be looked up on data directly, it's read
+        # through a Record instead
+        self._nested = any(is_path(field) for field in self._read_fields())
+
+    def _read_fields(self):
+        # every field the rules read, sources included
+        fields = set(self._sources)
+        deps = set(dep for deps in self.graph.edges.values() for dep in deps)
+        for entries in self._partials.values():
+            for condition, dependencies in entries:
+                fields.update(read_fields(condition))
+                deps.update(dependencies)
+        for dep in deps:
+            fields.add(dep.name)
+            if dep.expression is not None:
+                fields.update(read_fields(dep.expression))
+        return fields
+
+    def _view(self, data):
+        # plain mappings are read directly unless a rule reads a dotted
+        # path. Objects and nested data are wrapped in a Record, whose
+        # fields are checked in the order the rules were added
+        if type(data) is dict and not self._nested:
+            return data
+        if type(data) is Record or (not self._nested and isinstance(data, Mapping)):
+            return data
+        return Record(data, self._sources)
+
+    def deps(self, field, value):
+        deps = self._edges.get(field, ())
+        partials = self._partials.get(field)
+        if not partials:
+            return deps
+
+        lookup = {field: value}
+        return self._expand(deps, [
+            entries for condition, entries in partials if condition(lookup)
+        ])
+
+    @staticmethod
+    def _expand(deps, triggered):
+        # append the dependencies of triggered partials, skipping any that
+        # are already required
+        if not triggered:
+            return deps
+
+        seen = set(deps)
+        deps = list(deps)
+        for entries in triggered:
+            for dep in entries:
+                if dep not in seen:
+                    seen.add(dep)
+                    deps.append(dep)
+        return deps
+
+    def _check(self, field, dependency, data, memo=None):
+        dependency_name = dependency.name
+        if dependency_name not in data:
+            raise RequirementError(
+                field, dependency_name, None,
+                "%s requires '%s' to be present" % (field, dependency_name))
+
+        expression = dependency.expression
+        if expression is None:
+            return
+
+        try:
+            if memo is None:
+                valid = expression(data)
+            else:
+                valid = expression.evaluate(data, memo)
+            if not valid:
+                error_message = dependency.message or expression.error(
+                    field, dependency_name, data)
+                raise RequirementError(field, dependency_name, expression,
+                                       error_message)
+        except ResolveError as e:
+            raise RequirementError(
+                field, dependency_name, None,
+                "%s requires '%s' to be present" % (field, e.missing_field))
+
+    def validate(self, data):
+        data = self._view(data)
+        if instrumentation.hook is not None:
+            return self._validate_instrumented(data, instrumentation.hook)
+
+        # expressions and callables shared between rules are evaluated
+        # once per call
+        memo = {}
+        sources = self._sources
+        if type(data) is Record or len(sources) >= len(data):
+            return self._validate(data, data, memo)
+
+        # only a few fields of data have rules, find them from the rules.
+        # Whether data is valid doesn't depend on the order the fields are
+        # checked in, the order of data only decides which error is raised
+        try:
+            self._validate([field for field in sources if field in data], data, memo)
+        except Exception:
+            self._validate(data, data, memo)
+            raise
+
+    def _validate(self, fields, data, memo):
+        check = self._check
+        deps = self.deps
+        sources = self._fields
+        for field in fields:
+            if field not in sources:
+                continue
+            for dependency in deps(field, data[field]):
+                check(field, dependency, data, memo)
+
+    def _validate_instrumented(self, data, hook):
+        memo = {}
+        check = self._check
+        timed_check = instrumentation.timed_check
+        rule = hook.rule
+        start = instrumentation.clock()
+        try:
+            for field in data:
+                for dependency in self.deps(field, data[field]):
+                    timed_check(check, field, dependency, data, memo, rule)
+        except Exception as e:
+            hook.validation(instrumentation.clock() - start, e)
+            raise
+        hook.validation(instrumentation.clock() - start, None)
+
+    def revalidate(self, data, changed_fields):
+        """
+        Validate ``data``, which was valid before ``changed_fields`` were
+        set, added or removed, checking only the rules that read them.
+
+        Raises the same error as :meth:`validate` would.
+        """
+        data = self._view(data)
+        reverse = self._reverse
+        if reverse is None:
+            reverse = self._reverse = ReverseIndex(self.graph, self._partials)
+
+        changed_fields = reverse.related(changed_fields)
+        memo = {}
+        check = self._check
+        checked = set()
+        try:
+            for field in changed_fields:
+                if field in data:
+                    for dependency in self.deps(field, data[field]):
+                        check(field, dependency, data, memo)
+                        checked.add(dependency)
+
+            for dependency in reverse.readers(changed_fields):
+                if dependency in checked:
+                    continue
+                field = reverse.source(dependency, data)
+                if field is not None:
+                    check(field, dependency, data, memo)
+        except Exception:
+            # the first error in the order of data, which may come from
+            # another field than the one found here
+            self.validate(data)
+            raise
+
+    def avalidate(self, data):
+        """
+        Coroutine validating ``data``, awaiting any callables which return
+        awaitables and resolving independent ones concurrently.
+        """
+        return aio.avalidate(self, self._view(data))
+
+    def errors(self, data, max_errors=None):
+        """
+        Return every requirement ``data`` violates instead of raising the
+        first one, stopping once ``max_errors`` have been found.
+
+        Each field is checked against each of its dependencies once, so a
+        dependency it declares both fully and through a partial is only
+        reported once.
+        """
+        data = self._view(data)
+        hook = instrumentation.hook
+        if hook is None:
+            check = self._check
+        else:
+            def check(field, dependency, data, memo):
+                instrumentation.timed_check(
+                    self._check, field, dependency, data, memo, hook.rule)
+        memo = {}
+        errors = []
+        sources = self._fields
+        for field in data:
+            if field not in sources:
+                continue
+            for dependency in self.deps(field, data[field]):
+                try:
+                    check(field, dependency, data, memo)
+                except RequirementError as e:
+                    errors.append(e)
+                    if max_errors is not None and len(errors) >= max_errors:
+                        return errors
+        return errors
+
+    def iter_validate_many(self, rows, collect=False, max_errors=None):
+        """
+        Validate an iterable of records lazily, yielding ``(index, errors)``
+        for every row which fails validation.
+
+        Only the first error of a row is returned unless ``collect`` is set,
+        in which case up to ``max_errors`` errors are returned per row.
+        """
+        if collect:
+            errors = self.errors
+            for index, data in enumerate(rows):
+                row_errors = errors(data, max_errors)
+                if row_errors:
+                    yield index, row_errors
+            return
+
+        validate = self.validate
+        for index, data in enumerate(rows):
+            try:
+                validate(data)
+            except RequirementError as e:
+                yield index, [e]
+
+    def validate_many(self, rows, collect=False, max_errors=None):
+        """
+        Validate an iterable of records, returning a dict mapping the index
+        of every failing row to its errors.
+        """
+        return dict(self.iter_validate_many(rows, collect, max_errors))
@@ -4,11 +4,13 @@ from __future__ import unicode_literals
 import six
 import itertools
 
-from copy import deepcopy
 from collections import defaultdict
 
 from .expressions import RExpression, R, ResolveError
 from .exceptions import RequirementError
+from .plan import ValidationPlan
+from .graph import DependencyGraph
+from . import instrumentation
 
 
 class Empty(object):
@@ -20,6 +22,8 @@ empty = Empty()
 
 
 class Dependency(object):
+    __slots__ = ("name", "expression", "message")
+
     def __init__(self, name, expression=None, message=None):
         self.name = name
         self.expression = expression
@@ -44,6 +48,8 @@ class Dependency(object):
 
 
 class PartialDependency(object):
+    __slots__ = ("_keys", )
+
     def __init__(self, from_, keys=None):
         self._keys = keys or defaultdict(set)
         if isinstance(from_, RExpression):
@@ -64,12 +70,26 @@ class PartialDependency(object):
         return value in self._keys
 
     def get(self, value):
-        return self._keys[value]
+        return self._keys.get(value, frozenset())
+
+    def items(self):
+        return self._keys.items()
 
     def __eq__(self, other):
         return self._keys == other._keys
 
 
+def unique(deps):
+    # a dependency declared twice is checked once, as in Requires.deps
+    seen = set()
+    result = []
+    for dep in deps:
+        if dep not in seen:
+            seen.add(dep)
+            result.append(dep)
+    return tuple(result)
+
+
 class Requires(object):
     """
     """
@@ -85,6 +105,8 @@ class Requires(object):
         self.adj = {
             self._hash(from_): self._get_dep_object(from_, dep, message)
         }
+        self.nodes = {self._hash(from_): from_}
+        self._plan = None
 
     def _hash(self, obj):
         return hash(obj)
@@ -102,31 +124,80 @@ class Requires(object):
                 name=list(from_.get_fields())[0],
                 expression=dep,
                 message=message), )
+        if isinstance(dep, R) and isinstance(dep.field, six.string_types):
+            # a bare field, as the DSL builds for ``x -> y``
+            dep = dep.field
         # flat full dependency
         return (Dependency(name=dep, message=message), )
 
     def __add__(self, other):
         assert isinstance(other, Requires)
-        combined = list(self.adj.items()) + list(other.adj.items())
-        d = defaultdict(list)
-        for key, value in combined:
-            d[key].extend(list(value))
-        partials = self.partials + other.partials
-
-        new = deepcopy(self)
-        new.adj = d
-        new.partials = partials
+        return self.combine((self, other))
+
+    @classmethod
+    def combine(cls, requirements):
+        """
+        Merge an iterable of :class:`Requires` in a single pass.
+
+        Expression objects are shared with the merged requirements rather
+        than copied, so combining N rules is linear in N.
+        """
+        adj = defaultdict(list)
+        partials = defaultdict(set)
+        nodes = {}
+        for requires in requirements:
+            assert isinstance(requires, Requires)
+            for key, value in requires.adj.items():
+                adj[key].extend(value)
+            for key, value in requires.partials.items():
+                partials[key] |= value
+            nodes.update(requires.nodes)
+
+        new = cls.__new__(cls)
+        new.adj = dict((key, tuple(value)) for key, value in adj.items())
+        new.partials = PartialDependency(None, partials)
+        new.nodes = nodes
+        new._plan = None
+        return new
 
+    def rules(self):
+        """
+        Return ``(from_, dependencies)`` pairs, one per source node, in the
+        order they were added.
+        """
+        return [(self.nodes[key], deps) for key, deps in self.adj.items()]
+
+    @classmethod
+    def from_rules(cls, rules):
+        """
+        Build a :class:`Requires` from the pairs returned by :meth:`rules`.
+        """
+        adj = {}
+        nodes = {}
+        partials = defaultdict(set)
+        for from_, deps in rules:
+            key = hash(from_)
+            adj[key] = tuple(deps)
+            nodes[key] = from_
+            if isinstance(from_, RExpression):
+                from_name, = from_.get_fields()
+                partials[from_name].add(from_)
+
+        new = cls.__new__(cls)
+        new.adj = adj
+        new.partials = PartialDependency(None, partials)
+        new.nodes = nodes
+        new._plan = None
         return new
 
     def deps(self, key, value, seen=None):
-        # DFS of the dependency graph
+        # the dependencies ``key`` declares, a dependency that is present
+        # is checked as a field of its own
 
         partial_key = (key, value) if key in self.partials else None
 
-        # use of seen so we terminate and don't blow the stack
         seen = seen if seen else set()
-        seen.add(partial_key or key)
+        seen.add(key)
 
         hash_key_lookup = self._hash(R(key))
 
@@ -134,7 +205,7 @@ class Requires(object):
             # key has no dependencies or partial dependencies
             return []
 
-        rels = self.adj.get(hash_key_lookup, list())
+        rels = list(self.adj.get(hash_key_lookup, ()))
 
         if partial_key:
             # We need to resolve the partial dependency
@@ -152,9 +223,8 @@ class Requires(object):
         deps = []
         for dep in rels:
             if dep not in seen:
+                seen.add(dep)
                 deps.append(dep)
-                child_deps = self.deps(dep, value, seen)
-                deps.extend(child_deps)
         return deps
 
     def _validate(self, field, data):
@@ -184,8 +254,65 @@ class Requires(object):
                                                             e.missing_field))
 
     def validate(self, data):
-        for key in data.keys():
-            self._validate(key, data)
+        self.compile().validate(data)
+
+    def revalidate(self, data, changed_fields):
+        """
+        Validate ``data`` after ``changed_fields`` were set, added or
+        removed, assuming it was valid before. Only rules reading the
+        changed fields are checked.
+        """
+        self.compile().revalidate(data, changed_fields)
+
+    def avalidate(self, data):
+        return self.compile().avalidate(data)
+
+    def errors(self, data, max_errors=None):
+        return self.compile().errors(data, max_errors)
+
+    def validate_many(self, rows, collect=False, max_errors=None):
+        return self.compile().validate_many(rows, collect, max_errors)
+
+    def iter_validate_many(self, rows, collect=False, max_errors=None):
+        return self.compile().iter_validate_many(rows, collect, max_errors)
+
+    def compile(self):
+        """
+        Resolve the dependency graph into a :class:`ValidationPlan`.
+
+        The full dependencies of each field are deduplicated once, only
+        partial dependencies are left to be evaluated at validation time.
+        The plan is read only and cached, so a single :class:`Requires` can be
+        validated from many threads at once.
+        """
+        plan = self._plan
+        if plan is None:
+            hook = instrumentation.hook
+            if hook is None:
+                plan = self._plan = self._compile()
+            else:
+                start = instrumentation.clock()
+                plan = self._plan = self._compile()
+                hook.compile(self, instrumentation.clock() - start)
+        return plan
+
+    def _compile(self):
+        edges = {}
+        for key, node in self.nodes.items():
+            if isinstance(node, RExpression):
+                continue
+            if not isinstance(node.field, six.string_types):
+                continue
+            edges[node.field] = unique(self.adj[key])
+        graph = DependencyGraph(edges)
+
+        partials = {}
+        for field, expressions in self.partials.items():
+            partials[field] = tuple(
+                (exp, unique(self.adj[self._hash(exp)]))
+                for exp in expressions)
+
+        return ValidationPlan(graph, partials)
 
     def __eq__(self, other):
         return (self.adj == other.adj and self.partials == other.partials)
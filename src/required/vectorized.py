@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar evaluation of a :class:`Requires` over tabular data with NumPy.
+
+Each column is a NumPy array, a missing value in a row is modelled by a
+boolean presence mask per column. Masks are taken from masked arrays, from
+``present`` or, for pandas DataFrames, from ``notna()``.
+"""
+from __future__ import unicode_literals
+
+import operator
+
+from .expressions import RExpression, R, FieldOp, GenericOp, In, And, Or, Not
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+ARRAY_OPERATORS = frozenset([
+    operator.add,
+    operator.sub,
+    operator.mul,
+    operator.pow,
+    operator.truediv,
+    FieldOp.div_op,
+    operator.eq,
+    operator.ne,
+    operator.lt,
+    operator.le,
+    operator.gt,
+    operator.ge,
+])
+
+
+def expression_fields(node):
+    """
+    Return every field read while evaluating ``node``.
+    """
+    if isinstance(node, R):
+        if isinstance(node.field, FieldOp):
+            return expression_fields(node.field)
+        return {node.field}
+    if isinstance(node, FieldOp):
+        operands = node.args + tuple(node.kwargs.values())
+        return set().union(*[
+            expression_fields(arg) for arg in operands if isinstance(arg, R)])
+    if isinstance(node, In):
+        operands = (node.field, node.values)
+    elif isinstance(node, Not):
+        operands = (node.operand, )
+    elif isinstance(node, GenericOp):
+        operands = (node.lhs, node.rhs)
+    else:
+        return node.get_fields()
+    return set().union(*[
+        expression_fields(operand) for operand in operands
+        if isinstance(operand, (R, RExpression))])
+
+
+def truth(values):
+    values = np.asarray(values)
+    if values.dtype == bool:
+        return values
+    return values.astype(bool)
+
+
+def elementwise(func, nargs):
+    return np.frompyfunc(func, nargs, 1)
+
+
+class ColumnarResult(object):
+    """
+    ``failures[i, j]`` is True when row ``j`` violates ``rules[i]``, a
+    ``(field, dependency)`` pair.
+    """
+
+    def __init__(self, rules, failures):
+        self.rules = rules
+        self.failures = failures
+
+    def failed_rows(self):
+        return np.flatnonzero(self.failures.any(axis=0))
+
+    def __iter__(self):
+        return iter(zip(self.rules, self.failures))
+
+
+class ColumnarPlan(object):
+    """
+    A :class:`Requires` expanded into one rule per field and dependency,
+    each evaluated with array operations over whole columns.
+    """
+
+    def __init__(self, requires):
+        if np is None:
+            raise ImportError(
+                "numpy is required for vectorized validation, "
+                "install required[numpy]")
+
+        plan = requires.compile()
+        self._rules = []
+        for field, deps in plan.graph.edges.items():
+            for dependency in deps:
+                self._rules.append((field, dependency, None))
+        for field, partials in plan._partials.items():
+            for condition, entries in partials:
+                for dependency in entries:
+                    self._rules.append((field, dependency, condition))
+
+    @property
+    def rules(self):
+        return [(field, dependency) for field, dependency, _ in self._rules]
+
+    def evaluate(self, columns, present=None):
+        """
+        Return a :class:`ColumnarResult` for ``columns``, a mapping of field
+        name to array or a pandas DataFrame.
+        """
+        table = Table(columns, present)
+        failures = np.zeros((len(self._rules), table.length), dtype=bool)
+        for index, (field, dependency, condition) in enumerate(self._rules):
+            active = table.present(field)
+            if condition is not None:
+                active = active & table.truth(condition, active)
+
+            failed = ~table.present(dependency.name)
+            expression = dependency.expression
+            if expression is not None:
+                readable = table.readable(expression)
+                checked = active & readable
+                failed = failed | ~readable | (
+                    checked & ~table.truth(expression, checked))
+            failures[index] = active & failed
+        return ColumnarResult(self.rules, failures)
+
+
+class Table(object):
+
+    def __init__(self, columns, present=None):
+        self.columns = {}
+        self.masks = {}
+        present = present or {}
+
+        if hasattr(columns, "notna") and hasattr(columns, "columns"):
+            # pandas DataFrame, missing values are NA
+            for name in columns.columns:
+                self.columns[name] = columns[name].to_numpy()
+                self.masks[name] = columns[name].notna().to_numpy()
+        else:
+            for name, column in columns.items():
+                if isinstance(column, np.ma.MaskedArray):
+                    self.masks[name] = ~np.ma.getmaskarray(column)
+                    column = np.ma.getdata(column)
+                self.columns[name] = np.asarray(column)
+
+        for name, mask in present.items():
+            mask = np.asarray(mask, dtype=bool)
+            if name in self.masks:
+                mask = mask & self.masks[name]
+            self.masks[name] = mask
+
+        lengths = set(len(column) for column in self.columns.values())
+        if len(lengths) > 1:
+            raise ValueError("columns must all have the same length")
+        self.length = lengths.pop() if lengths else 0
+        self._values = {}
+
+    def present(self, field):
+        if field not in self.columns:
+            return np.zeros(self.length, dtype=bool)
+        mask = self.masks.get(field)
+        if mask is None:
+            return np.ones(self.length, dtype=bool)
+        return mask
+
+    def readable(self, node):
+        """
+        Rows where ``node`` can be evaluated without a missing field, the
+        rhs of ``And``/``Or`` is only needed where the lhs doesn't decide.
+        """
+        if isinstance(node, (And, Or)):
+            if not isinstance(node.lhs, (R, RExpression)):
+                return self.readable_operand(node.rhs)
+            readable = self.readable(node.lhs)
+            decided = self.truth(node.lhs, readable)
+            if isinstance(node, And):
+                decided = readable & ~decided
+            return readable & (decided | self.readable_operand(node.rhs))
+        if isinstance(node, Not):
+            return self.readable_operand(node.operand)
+
+        mask = np.ones(self.length, dtype=bool)
+        for field in expression_fields(node):
+            mask = mask & self.present(field)
+        return mask
+
+    def readable_operand(self, value):
+        if isinstance(value, (R, RExpression)):
+            return self.readable(value)
+        return np.ones(self.length, dtype=bool)
+
+    def truth(self, node, rows):
+        """
+        Evaluate ``node`` to a boolean array, rows outside of ``rows`` are
+        left False.
+        """
+        if not rows.any():
+            return np.zeros(self.length, dtype=bool)
+        try:
+            with np.errstate(all="ignore"):
+                return truth(self.evaluate(node)) & rows
+        except Exception:
+            return self.rowwise(node, rows)
+
+    def rowwise(self, node, rows):
+        # fall back to the interpreter for expressions NumPy can't
+        # broadcast, e.g. comparisons against placeholder values
+        result = np.zeros(self.length, dtype=bool)
+        fields = [
+            field for field in expression_fields(node) if field in self.columns]
+        for row in np.flatnonzero(rows):
+            data = dict(
+                (field, self.columns[field][row]) for field in fields
+                if self.present(field)[row])
+            result[row] = bool(node(data))
+        return result
+
+    def evaluate(self, node):
+        key = id(node)
+        if key not in self._values:
+            self._values[key] = self._evaluate(node)
+        return self._values[key]
+
+    def operand(self, value):
+        if isinstance(value, (R, RExpression)):
+            return self.evaluate(value)
+        return value
+
+    def _evaluate(self, node):
+        if isinstance(node, R):
+            if isinstance(node.field, FieldOp):
+                return self.evaluate(node.field)
+            return self.columns[node.field]
+
+        if isinstance(node, FieldOp):
+            args = [
+                self.evaluate(arg) if isinstance(arg, R) else arg
+                for arg in node.args
+            ]
+            kwargs = dict(
+                (name, self.evaluate(value) if isinstance(value, R) else value)
+                for name, value in node.kwargs.items())
+            if node.operator in ARRAY_OPERATORS and not kwargs:
+                return node.operator(*args)
+
+            def call(*args):
+                return node.operator(*args, **kwargs)
+            return elementwise(call, len(args))(*args)
+
+        if isinstance(node, In):
+            field = self.operand(node.field)
+            values = node.values
+            if isinstance(values, (R, RExpression)):
+                return elementwise(In.contains, 2)(field, self.evaluate(values))
+            if getattr(field, "dtype", None) != object:
+                return np.isin(field, list(values))
+            if node._members is not None:
+                return elementwise(node.contains_constant, 1)(field)
+            return elementwise(lambda item: In.contains(item, values), 1)(field)
+
+        if isinstance(node, And):
+            return np.logical_and(
+                truth(self.operand(node.lhs)), truth(self.operand(node.rhs)))
+
+        if isinstance(node, Or):
+            return np.logical_or(
+                truth(self.operand(node.lhs)), truth(self.operand(node.rhs)))
+
+        if isinstance(node, Not):
+            return np.logical_not(truth(self.operand(node.operand)))
+
+        if isinstance(node, GenericOp):
+            lhs = self.operand(node.lhs)
+            rhs = self.operand(node.rhs)
+            op = node.get_operator()
+            if op in ARRAY_OPERATORS:
+                return op(lhs, rhs)
+            return elementwise(op, 2)(lhs, rhs)
+
+        raise TypeError("can't vectorize %r" % node)
+
+
+def validate_columns(requires, columns, present=None):
+    """
+    Evaluate ``requires`` over ``columns`` and return a
+    :class:`ColumnarResult` of per rule failures.
+    """
+    return ColumnarPlan(requires).evaluate(columns, present)
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Helpers and cases shared by the test modules.
+"""
+from required import Requires, R, RequirementError, ResolveError, Func
+from required.expressions import And, Or, Not
+
+
+def reference(requires):
+    # the per field validation every backend must agree with: each field is
+    # checked against the dependencies it declares, then against those of
+    # its partial rules whose condition holds for its value
+    rules = dict(requires.rules())
+
+    def check(field, dependency, data):
+        name = dependency.get_key()
+        missing = "%s requires '%s' to be present"
+        if name not in data:
+            raise RequirementError(field, name, None, missing % (field, name))
+        expression = dependency.get_value()
+        if expression is requires.empty:
+            return
+        try:
+            valid = expression(data)
+        except ResolveError as e:
+            raise RequirementError(
+                field, name, None, missing % (field, e.missing_field))
+        if not valid:
+            raise RequirementError(
+                field, name, expression,
+                dependency.get_error_message() or
+                expression.error(field, name, data))
+
+    def validate(data):
+        for field in data:
+            deps = list(rules.get(R(field), ()))
+            for condition in requires.partials.get(field):
+                if condition({field: data[field]}):
+                    deps.extend(rules[condition])
+            checked = []
+            for dep in deps:
+                if dep not in checked:
+                    checked.append(dep)
+                    check(field, dep, data)
+    return validate
+
+
+def error_of(validate, data):
+    try:
+        validate(data)
+    except RequirementError as e:
+        return (e.field, e.dependency_name, e.dependency_value, str(e))
+    except Exception as e:
+        return type(e)
+    return None
+
+
+def double(x, factor=2):
+    return x * factor
+
+
+requirements = [
+    Requires("x", "y"),
+    Requires("x", "y") + Requires("y", "z"),
+    Requires("x", "y") + Requires("y", "x"),
+    Requires("x", R("y") > 1) + Requires("y", R("z") < R("y")),
+    Requires("x", R("y") >= R("x")) + Requires("z", R("y") <= R("z")),
+    Requires("x", R("x") != R("y")) + Requires("y", R("y") == 1),
+    Requires("x", R("x") + 1 == R("y") - 1),
+    Requires("x", R("x") * 2 == R("y") ** 2),
+    Requires("x", R("x") / 2 < R("y")),
+    Requires("x", R("x").length() == 1),
+    Requires("x", Func(double, R("x")) == R("y")),
+    Requires("x", Func(double, R("x"), factor=3) == R("y")),
+    Requires("x", Func(len, R("y")) + Func(len, R("z")) == R("x")),
+    Requires("x", R("x").in_(R("y"))) + Requires("y", "z"),
+    Requires("x", R("x").in_([1, 2])),
+    Requires("x", R("x").in_((1, "a", None))),
+    Requires("x", And(R("x") > 0, R("y") > 0)),
+    Requires("x", Or(R("x") > 1, R("y") > 1)),
+    Requires("x", Not(R("y") == 1)),
+    Requires("x", And(R("x") > 1, Or(R("y") == 1, Not(R("z") == 1)))),
+    Requires(And(R("x") > 0, Not(R("x") == 2)), "y"),
+    Requires("x", R("y") > 1, message="custom message"),
+    Requires(R("x") == 1, "y") + Requires(R("x") == 2, "z"),
+    Requires(R("x") == 1, R("y") == 1) + Requires("x", "z"),
+    Requires(R("x") > 1, R("x") == R("y")) + Requires(R("x") < 1, R("x") != R("y")),
+    Requires(R("x") == 1, "y") + Requires("y", "z") + Requires("z", R("x") > 0),
+    Requires(Func(len, R("x")) > 1, "y") + Requires(R("y") == 1, "z"),
+]
+
+payloads = [
+    {},
+    {"x": 1},
+    {"x": 2},
+    {"x": 1, "y": 1},
+    {"x": 1, "y": 2},
+    {"x": 2, "y": 4},
+    {"x": 2, "y": 6},
+    {"x": 2, "y": 1, "z": 1},
+    {"x": 2, "y": [1, 2], "z": [3]},
+    {"x": 3, "y": [1, 2], "z": [3]},
+    {"x": [1], "y": 1},
+    {"x": [1, 2], "y": 1, "z": 1},
+    {"x": (1, 2), "y": [2]},
+    {"x": None, "y": 1},
+    {"y": 2, "z": 1},
+    {"y": 1, "z": 2},
+    {"z": 1, "x": 1, "y": 1},
+    {"x": 0, "y": 0},
+    {"x": -1, "y": 0},
+    {"x": "a", "y": 1},
+]
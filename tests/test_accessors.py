@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+from collections import namedtuple
+
+import pytest
+
+from required import Requires, R, RequirementError, Func, validate
+from required import accessors
+from required.accessors import Accessor, Path, Record, path, register
+from required.codegen import generate
+
+from .helpers import error_of
+
+
+class Obj(object):
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+Item = namedtuple("Item", ["sku", "qty"])
+
+
+requires = (
+    Requires("address.postcode", R("address.country") == "GB") +
+    Requires("items.0.sku", R("items.0.qty") > 0) +
+    Requires(R("address.country") == "GB", "vat")
+)
+
+payloads = [
+    ({}, {}),
+    ({"address": {"postcode": "N1"}}, {"address.postcode": "N1"}),
+    (
+        {"address": {"postcode": "N1", "country": "FR"}},
+        {"address.postcode": "N1", "address.country": "FR"},
+    ),
+    (
+        {"address": {"postcode": "N1", "country": "GB"}},
+        {"address.postcode": "N1", "address.country": "GB"},
+    ),
+    (
+        {"address": {"postcode": "N1", "country": "GB"}, "vat": 1},
+        {"address.postcode": "N1", "address.country": "GB", "vat": 1},
+    ),
+    ({"items": [{"sku": "a", "qty": 0}]}, {"items.0.sku": "a", "items.0.qty": 0}),
+    ({"items": [{"sku": "a", "qty": 1}]}, {"items.0.sku": "a", "items.0.qty": 1}),
+    ({"items": [{"sku": "a"}]}, {"items.0.sku": "a"}),
+    ({"items": []}, {}),
+]
+
+
+class TestPath(object):
+
+    def test_paths_are_compiled_once(self):
+        assert path("a.b") is path("a.b")
+        assert path("a.b").segments == ("a", "b")
+        assert R("a.b").path is path("a.b")
+        assert R("a").path is None
+
+    @pytest.mark.parametrize("record", [
+        {"address": {"postcode": "N1"}},
+        {"address.postcode": "N1"},
+        Obj(address=Obj(postcode="N1")),
+        {"address": Obj(postcode="N1")},
+        Obj(address={"postcode": "N1"}),
+    ])
+    def test_nested_records(self, record):
+        assert Path("address.postcode")(record) == "N1"
+
+    def test_indexes(self):
+        record = {"items": [Item("a", 1), Item("b", 2)]}
+        assert Path("items.1.sku")(record) == "b"
+        assert Path("items.1.1")(record) == 2
+
+    @pytest.mark.parametrize("record", [
+        {},
+        {"address": None},
+        {"address": {}},
+        {"address": "N1"},
+        {"items": []},
+        {"items": [1]},
+        {"items": {"0": 1}},
+        Obj(),
+    ])
+    def test_missing(self, record):
+        for field in ("address.postcode", "items.0.sku", "items.x"):
+            with pytest.raises(KeyError):
+                Path(field)(record)
+
+
+class TestRegister(object):
+
+    @pytest.fixture(autouse=True)
+    def clean(self):
+        registry = dict(accessors._registry)
+        yield
+        accessors._registry.clear()
+        accessors._registry.update(registry)
+        accessors._resolved.clear()
+
+    def test_custom_accessor(self):
+        class Row(object):
+            def __init__(self, values):
+                self.values = values
+
+        class RowAccessor(Accessor):
+            def get(self, record, key):
+                return record.values[key]
+
+        class SubRow(Row):
+            pass
+
+        register(Row, RowAccessor())
+        assert Path("a.b")(SubRow({"a": Row({"b": 1})})) == 1
+        with pytest.raises(KeyError):
+            Path("a.c")(Row({"a": Row({"b": 1})}))
+
+        requires = Requires("a.b", R("a.b") > 1)
+        requires.validate(Row({"a": Row({"b": 2})}))
+        with pytest.raises(RequirementError):
+            requires.validate(Row({"a": Row({"b": 1})}))
+
+
+class TestRecord(object):
+
+    def test_mapping(self):
+        record = Record({"a": {"b": 1}, "c": 2}, ("a.b", "a.c", "c"))
+        assert record["a.b"] == 1
+        assert "a.b" in record
+        assert "a.c" not in record
+        assert list(record) == ["a.b", "c"]
+        assert len(record) == 2
+        assert dict(record) == {"a.b": 1, "c": 2}
+
+    def test_fields_are_read_once(self):
+        reads = []
+
+        class Counted(object):
+            @property
+            def value(self):
+                reads.append(1)
+                return 1
+
+        requires = Requires("x.value", R("x.value") > 0) + Requires("y", R("x.value") < 2)
+        requires.validate(Obj(x=Counted(), y=1))
+        assert len(reads) == 1
+
+
+class TestValidate(object):
+
+    @pytest.mark.parametrize("nested,flat", payloads)
+    def test_nested_matches_flattened(self, nested, flat):
+        errors = [str(e) for e in requires.errors(flat)]
+        assert [str(e) for e in requires.errors(nested)] == errors
+        assert (error_of(requires.validate, nested) is None) == (not errors)
+        assert (error_of(generate(requires).validate, nested) is None) == (not errors)
+
+    def test_expressions_resolve_paths(self):
+        assert (R("a.b") > 1)({"a": {"b": 2}})
+        assert not (R("a.b") > 1)({"a.b": 1})
+
+    def test_objects(self):
+        order = Obj(
+            address=Obj(postcode="N1", country="GB"),
+            items=[Item("a", 1)], vat=1)
+        requires.validate(order)
+        generate(requires).validate(order)
+
+        order.items = [Item("a", 0)]
+        with pytest.raises(RequirementError) as excinfo:
+            requires.validate(order)
+        assert excinfo.value.field == "items.0.sku"
+        assert [e.field for e in requires.errors(order)] == ["items.0.sku"]
+
+    def test_flat_objects(self):
+        requires = Requires("x", R("y") > 1)
+        requires.validate(Obj(x=1, y=2))
+        with pytest.raises(RequirementError):
+            requires.validate(Obj(x=1, y=1))
+        assert requires.validate_many([Obj(x=1, y=2), Obj(x=1)]).keys() == {1}
+
+    def test_revalidate_parent(self):
+        data = {"address": {"postcode": "N1", "country": "GB"}, "vat": 1}
+        requires.revalidate(data, ["address"])
+        data["address"] = {"postcode": "N1", "country": "FR"}
+        with pytest.raises(RequirementError):
+            requires.revalidate(data, ["address"])
+        del data["vat"]
+        data["address"] = {"postcode": "N1", "country": "GB"}
+        with pytest.raises(RequirementError):
+            requires.revalidate(data, ["address.country"])
+
+    def test_decorated_arguments(self):
+        @validate
+        def save(user, notify=False):
+            "user.email -> user.name; notify == 1 -> user.email"
+
+        save(Obj(name="a"))
+        save(Obj(email="a@b.c", name="a"), notify=True)
+        with pytest.raises(RequirementError):
+            save(Obj(email="a@b.c"))
+        with pytest.raises(RequirementError):
+            save(Obj(name="a"), notify=True)
+
+    def test_callables_read_paths(self):
+        requires = Requires("items", Func(len, R("items")) == R("count.items"))
+        requires.validate({"items": [1], "count": {"items": 1}})
+        with pytest.raises(RequirementError):
+            requires.validate({"items": [1], "count": {"items": 2}})
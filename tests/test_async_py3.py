@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import inspect
+
+import pytest
+
+from required import Requires, R, Func, RequirementError, validate, pure
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def lookup(value):
+    await asyncio.sleep(0)
+    return value * 2
+
+
+class TestAsyncRequires(object):
+
+    def test_avalidate_awaits_callables(self):
+        requires = Requires("x", Func(lookup, R("x")) == R("y"))
+
+        run(requires.avalidate({"x": 1, "y": 2}))
+
+        with pytest.raises(RequirementError):
+            run(requires.avalidate({"x": 1, "y": 3}))
+
+    def test_avalidate_nested_paths(self):
+        requires = Requires("user.id", Func(lookup, R("user.id")) == R("user.key"))
+
+        run(requires.avalidate({"user": {"id": 1, "key": 2}}))
+
+        with pytest.raises(RequirementError):
+            run(requires.avalidate({"user": {"id": 1, "key": 3}}))
+
+    def test_avalidate_matches_validate_errors(self):
+        requires = (
+            Requires("x", "y") + Requires("y", R("z") < R("y")) +
+            Requires(R("x") == 1, R("y") > 1)
+        )
+        payloads = [
+            {"x": 1},
+            {"x": 1, "y": 1, "z": 0},
+            {"x": 2, "y": 1, "z": 2},
+            {"x": 2, "y": 3},
+            {"x": 1, "y": 2, "z": 1},
+        ]
+        for data in payloads:
+            try:
+                requires.validate(data)
+            except RequirementError as e:
+                with pytest.raises(RequirementError) as excinfo:
+                    run(requires.avalidate(data))
+                assert str(excinfo.value) == str(e)
+                assert excinfo.value.field == e.field
+            else:
+                run(requires.avalidate(data))
+
+    def test_avalidate_awaits_partial_conditions(self):
+        requires = Requires(Func(lookup, R("x")) == 2, "y")
+
+        with pytest.raises(RequirementError):
+            run(requires.avalidate({"x": 1}))
+
+        run(requires.avalidate({"x": 2}))
+
+    def test_avalidate_runs_callables_concurrently(self):
+        running = []
+        peak = []
+
+        async def slow(value):
+            running.append(value)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(value)
+            return value
+
+        requires = (
+            Requires("x", Func(slow, R("x")) > 0) +
+            Requires("y", Func(slow, R("y")) > 0) +
+            Requires("z", Func(slow, R("z")) > 0)
+        )
+        run(requires.avalidate({"x": 1, "y": 2, "z": 3}))
+        assert max(peak) == 3
+
+    def test_avalidate_missing_field(self):
+        requires = Requires("x", Func(lookup, R("y")) > R("z"))
+        with pytest.raises(RequirementError) as excinfo:
+            run(requires.avalidate({"x": 1, "y": 1}))
+        assert str(excinfo.value) == "x requires 'z' to be present"
+
+    def test_avalidate_short_circuits(self):
+        calls = []
+
+        async def expensive(value):
+            calls.append(value)
+            return value
+
+        requires = Requires("x", (R("x") > 1) | (Func(expensive, R("y")) > 1))
+        run(requires.avalidate({"x": 2, "y": 0}))
+        assert calls == []
+
+        with pytest.raises(RequirementError):
+            run(requires.avalidate({"x": 1, "y": 1}))
+        assert calls == [1]
+
+    def test_coroutine_functions_cant_be_pure(self):
+        with pytest.raises(TypeError):
+            pure(lookup)
+
+
+class TestAsyncDecorator(object):
+
+    def test_coroutine_function_gets_async_wrapper(self):
+        custom_validate = validate.register_callables({"lookup": lookup})
+
+        @custom_validate
+        async def somefunction(x, y=2):
+            """
+            x -> lookup(x) == y
+            """
+            return x, y
+
+        assert inspect.iscoroutinefunction(somefunction)
+        assert run(somefunction(1)) == (1, 2)
+
+        with pytest.raises(RequirementError):
+            run(somefunction(1, y=3))
+
+    def test_lazy_coroutine_function(self):
+
+        @validate(lazy=True)
+        async def somefunction(x, y):
+            """
+            x -> x > y
+            """
+            return x
+
+        with pytest.raises(RequirementError):
+            run(somefunction(1, 2))
+
+        assert run(somefunction(2, 1)) == 2
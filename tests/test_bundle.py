@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+import sys
+import json
+import importlib
+import textwrap
+
+import lark
+import pytest
+
+import required
+from required import dsl
+from required import Requires, R, Func, validate, requirements_cache
+from required.bundle import (
+    BUNDLE_FILENAME, bundles, bundle_key, dump_requires, load_requires,
+    load_bundle, precompile,
+)
+from required.dsl import build_requirements_factory, init_parser, init_transformer, normalize_rules
+from required.exceptions import BundleError, RequirementError
+from required.__main__ import main
+
+
+def length(value):
+    return len(value)
+
+
+callables = {"length": length}
+
+RULES = """
+    x -> y
+    x -> (x + 1) > 2 and not y in z
+    length(z) > 2 -> length(z) < 5
+    y == 4 -> z
+    x -> x != "a" or x <= 3
+"""
+
+
+def build(rules, callables_dict=callables):
+    return build_requirements_factory(
+        init_parser(), init_transformer(callables_dict), cache=None)(rules)
+
+
+@pytest.fixture(autouse=True)
+def clean():
+    bundles.clear()
+    requirements_cache.clear()
+    yield
+    bundles.clear()
+    requirements_cache.clear()
+
+
+def disable_parsing(monkeypatch):
+    def parse(self, *args, **kwargs):
+        raise AssertionError("parser used")
+    monkeypatch.setattr(lark.Lark, "parse", parse)
+
+
+class TestRoundTrip(object):
+
+    def test_rules_round_trip(self):
+        requires = build(RULES)
+        assert Requires.from_rules(requires.rules()) == requires
+
+    def test_dumped_rules_are_json(self):
+        requires = build(RULES)
+        dumped = json.loads(json.dumps(dump_requires(requires, callables)))
+        assert load_requires(dumped, callables) == requires
+
+    @pytest.mark.parametrize("data", [
+        {"x": 2, "y": 3},
+        {"x": 1, "y": 3},
+        {"x": 2, "y": 1},
+        {"x": 2, "y": 3, "z": [1, 2, 3, 4, 5]},
+        {"y": 4},
+    ])
+    def test_loaded_rules_validate_the_same(self, data):
+        requires = build(RULES)
+        loaded = load_requires(dump_requires(requires, callables), callables)
+        assert list(map(str, loaded.errors(data))) == list(map(str, requires.errors(data)))
+
+    def test_python_rules(self):
+        requires = (
+            Requires("x", R("y") + 1 > Func(length, R("x"))) +
+            Requires(R("x").in_((1, 2)), "z", message="x is small")
+        )
+        loaded = load_requires(dump_requires(requires, callables), callables)
+        assert loaded == requires
+
+    def test_unregistered_callable(self):
+        requires = Requires("x", Func(lambda x: x, R("x")) > 1)
+        with pytest.raises(BundleError):
+            dump_requires(requires, callables)
+
+    def test_unserializable_constant(self):
+        requires = Requires("x", R("x") == object())
+        with pytest.raises(BundleError):
+            dump_requires(requires, callables)
+
+
+class TestBundles(object):
+
+    def add(self, rules):
+        rules = normalize_rules(rules)
+        bundles.add({bundle_key(rules, callables): dump_requires(build(rules), callables)})
+
+    def test_bundled_rules_skip_the_parser(self, monkeypatch):
+        self.add(RULES)
+        disable_parsing(monkeypatch)
+        requires = build_requirements_factory(init_parser(), init_transformer(callables))(RULES)
+        with pytest.raises(RequirementError):
+            requires.validate({"x": 2})
+
+    def test_changed_rules_are_parsed(self):
+        self.add(RULES)
+        requires = build_requirements_factory(
+            init_parser(), init_transformer(callables))(RULES + "\nz -> x")
+        assert requires == build(RULES + "\nz -> x")
+
+    def test_callables_are_looked_up_by_name(self):
+        self.add(RULES)
+        other = {"length": lambda value: 0}
+        assert bundles.get(normalize_rules(RULES), other) is not None
+        assert bundles.get(normalize_rules(RULES), {}) is None
+
+    def test_custom_transformer_skips_bundles(self, monkeypatch):
+        class Transformer(type(init_transformer(callables))):
+            pass
+
+        self.add(RULES)
+        disable_parsing(monkeypatch)
+        with pytest.raises(AssertionError):
+            build_requirements_factory(init_parser(), Transformer(callables))(RULES)
+
+
+PACKAGE = '''
+from required import validate
+
+validate_length = validate.register_callables({"length": len})
+
+
+@validate
+def plain(x, y=None):
+    """
+    Requires {
+        x -> y
+    }
+    """
+
+
+@validate_length
+def sized(x):
+    "x -> length(x) > 1"
+
+
+class Methods(object):
+
+    @staticmethod
+    @validate_length
+    def static(x):
+        "x -> length(x) > 1"
+'''
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    root = tmp_path / "bundled_rules"
+    (root / "sub").mkdir(parents=True)
+    (root / "__init__.py").write_text(textwrap.dedent(PACKAGE))
+    (root / "sub" / "__init__.py").write_text(
+        u"from required import validate\n\n\n@validate\ndef nested(a, b=None):\n    'a -> b > a'\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield root
+    for name in list(sys.modules):
+        if name.startswith("bundled_rules"):
+            del sys.modules[name]
+
+
+class TestPrecompile(object):
+
+    def test_precompile(self, package, monkeypatch):
+        path, entries = precompile("bundled_rules")
+        assert path == str(package / BUNDLE_FILENAME)
+        assert entries == 3
+
+        disable_parsing(monkeypatch)
+        requirements_cache.clear()
+        assert load_bundle(path) == 3
+        validate_length = validate.register_callables({"length": len})
+
+        @validate
+        def nested(a, b=None):
+            "a -> b > a"
+
+        @validate_length
+        def sized(x):
+            "x -> length(x) > 1"
+
+        with pytest.raises(RequirementError):
+            nested(1, 0)
+        with pytest.raises(RequirementError):
+            sized("a")
+
+    def test_bundled_package_skips_the_grammar(self, package, monkeypatch):
+        path, _ = precompile("bundled_rules")
+        for name in list(sys.modules):
+            if name.startswith("bundled_rules"):
+                del sys.modules[name]
+        requirements_cache.clear()
+        monkeypatch.setattr(dsl, "_parser", None)
+
+        assert load_bundle(path) == 3
+        bundled_rules = importlib.import_module("bundled_rules")
+        importlib.import_module("bundled_rules.sub")
+        with pytest.raises(RequirementError):
+            bundled_rules.sized("a")
+        assert dsl._parser is None
+
+    def test_other_versions_are_ignored(self, package, monkeypatch):
+        path, _ = precompile("bundled_rules")
+        monkeypatch.setattr(required, "__version__", "0.0.0")
+        assert load_bundle(path) == 0
+
+    def test_command(self, package, tmp_path, capsys):
+        output = tmp_path / "rules.json"
+        assert main(["precompile", "bundled_rules", "--output", str(output)]) == 0
+        assert "wrote 3 rule sets" in capsys.readouterr().out
+        assert load_bundle(str(output)) == 3
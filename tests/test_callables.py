@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+from required import Requires, R, Func, pure
+from required.callables import PureCallable
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def counted(calls):
+    def normalize(value, suffix=""):
+        calls.append(value)
+        return value.lower() + suffix
+    return normalize
+
+
+class TestPureCallable(object):
+
+    def test_results_are_cached(self):
+        calls = []
+        normalize = PureCallable(counted(calls))
+        assert normalize("A") == "a"
+        assert normalize("A") == "a"
+        assert normalize("B") == "b"
+        assert calls == ["A", "B"]
+        assert normalize.cache_info() == (1, 2, 128, 2)
+
+    def test_kwargs_are_part_of_the_key(self):
+        calls = []
+        normalize = PureCallable(counted(calls))
+        assert normalize("A", suffix="!") == "a!"
+        assert normalize("A") == "a"
+        assert normalize("A", suffix="!") == "a!"
+        assert calls == ["A", "A"]
+
+    def test_unhashable_arguments_are_not_cached(self):
+        calls = []
+        length = PureCallable(lambda value: calls.append(value) or len(value))
+        assert length([1, 2]) == 2
+        assert length([1, 2]) == 2
+        assert len(calls) == 2
+        assert length.cache_info().currsize == 0
+
+    def test_lru_eviction(self):
+        calls = []
+        normalize = PureCallable(counted(calls), maxsize=2)
+        for value in ("A", "B", "A", "C", "A", "B"):
+            normalize(value)
+        # B is the least recently used when C is added
+        assert calls == ["A", "B", "C", "B"]
+        assert normalize.cache_info().currsize == 2
+
+    def test_ttl(self):
+        calls = []
+        clock = Clock()
+        normalize = PureCallable(counted(calls), ttl=10, clock=clock)
+        normalize("A")
+        clock.now = 9
+        normalize("A")
+        clock.now = 10
+        normalize("A")
+        assert calls == ["A", "A"]
+
+    def test_cache_clear(self):
+        calls = []
+        normalize = PureCallable(counted(calls))
+        normalize("A")
+        normalize.cache_clear()
+        normalize("A")
+        assert calls == ["A", "A"]
+        assert normalize.cache_info() == (0, 1, 128, 1)
+
+    def test_pure_decorator(self):
+        calls = []
+
+        @pure
+        def normalize(value):
+            calls.append(value)
+            return value.lower()
+
+        @pure(maxsize=1, ttl=60)
+        def upper(value):
+            return value.upper()
+
+        assert isinstance(normalize, PureCallable)
+        assert normalize.__name__ == "normalize"
+        assert (upper.maxsize, upper.ttl) == (1, 60)
+
+        requires = Requires("x", Func(normalize, R("x")) == "a")
+        requires.validate({"x": "A"})
+        requires.validate({"x": "A"})
+        assert calls == ["A"]
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from required import Requires, R, RequirementError
+from required.codegen import generate
+
+from .helpers import error_of, reference, requirements, payloads
+
+
+class TestGeneratedPlan(object):
+
+    @pytest.mark.parametrize("requires", requirements)
+    @pytest.mark.parametrize("data", payloads)
+    def test_generated_plan_matches_interpreter(self, requires, data):
+        generated = generate(requires)
+        assert error_of(generated.validate, data) == error_of(reference(requires), data)
+
+    def test_generated_source_inlines_operators(self):
+        generated = generate(Requires("x", R("x") + 1 > R("y")))
+        assert "((data[_k0] + _c" in generated.source
+        assert "> data[" in generated.source
+
+    def test_generated_plan_raises_requirement_error(self):
+        generated = generate(Requires("x", "y"))
+        with pytest.raises(RequirementError):
+            generated.validate({"x": 1})
+        generated.validate({"x": 1, "y": 2})
+
+    def test_generated_source_is_linear_in_chain_length(self):
+        def chain(length):
+            return Requires.combine(
+                Requires("f%d" % index, "f%d" % (index + 1)) for index in range(length))
+
+        # each field function checks its own dependency only
+        lines = [len(generate(chain(length)).source.splitlines()) for length in (500, 1000)]
+        assert lines[1] - lines[0] == lines[0] - len(generate(chain(0)).source.splitlines())
+
+        generated = generate(chain(1000))
+        data = dict(("f%d" % index, 1) for index in range(1000))
+        assert error_of(generated.validate, data) == (
+            "f999", "f1000", None, "f999 requires 'f1000' to be present")
@@ -3,12 +3,17 @@ import pytest
 
 from functools import partial
 
+from lark.exceptions import UnexpectedInput
+
 from required import (
     Requires, R,
     RequirementError, validate,
     init_parser, init_transformer,
-    DecoratorError,
+    DecoratorError, RequiredSyntaxError, warmup,
+    build_requirements_factory,
 )
+from required import decorator
+from required.decorator import Validate
 
 
 class TestDecorator(object):
@@ -24,6 +29,20 @@ class TestDecorator(object):
 
         somefunction(x=2, y=1)
 
+    def test_docstring_field_dependency(self):
+        @validate
+        def somefunction(**kwargs):
+            """
+            x -> y
+            """
+            return kwargs
+
+        somefunction(x=1, y=2)
+        somefunction(y=2)
+        with pytest.raises(RequirementError) as excinfo:
+            somefunction(x=1)
+        assert excinfo.value.dependency_name == "y"
+
     def test_required_decorator_works_when_called_with_args(self):
         requires = Requires("x", R("x") > R("y"))
 
@@ -170,6 +189,28 @@ class TestDecorator(object):
 
         somefunction(1, 1)
 
+    def test_required_decorator_with_pure_callables(self):
+        calls = []
+
+        def normalize(value):
+            calls.append(value)
+            return value.lower()
+
+        custom_validate = validate.register_callables({"normalize": normalize}, pure=True)
+
+        @custom_validate
+        def somefunction(name):
+            """
+            name -> normalize(name) == "a"
+            """
+            return name
+
+        for _ in range(3):
+            somefunction("A")
+        with pytest.raises(RequirementError):
+            somefunction("B")
+        assert calls == ["A", "B"]
+
     def test_required_decorator_with_function_scope_inheritance(self):
 
         custom_validate_outer = validate.register_callables({
@@ -230,3 +271,174 @@ class TestDecorator(object):
 
         with pytest.raises(DecoratorError):
             validate()
+
+
+class TestLazyDecorator(object):
+
+    def teardown_method(self, method):
+        del decorator._pending[:]
+
+    def test_lazy_decorator_compiles_on_first_call(self):
+        calls = []
+
+        def tracking_factory(parser, transformer):
+            def inner(text):
+                calls.append(text)
+                return build_requirements_factory(parser, transformer)(text)
+            return inner
+
+        lazy_validate = Validate(build_requirements_factory=tracking_factory, lazy=True)
+
+        @lazy_validate
+        def somefunction(x, y):
+            """
+            x -> x > y
+            """
+            return x, y
+
+        assert calls == []
+
+        with pytest.raises(RequirementError):
+            somefunction(1, 2)
+
+        assert somefunction(2, 1) == (2, 1)
+        assert len(calls) == 1
+
+    def test_lazy_keyword_defers_syntax_errors_until_warmup(self):
+
+        @validate(lazy=True)
+        def somefunction(x, y):
+            """
+            x -> x >
+            """
+            return x, y
+
+        with pytest.raises(RequiredSyntaxError):
+            warmup()
+
+        with pytest.raises(UnexpectedInput):
+            somefunction(1, 2)
+
+        # still pending until it compiles successfully
+        with pytest.raises(RequiredSyntaxError):
+            warmup()
+
+    def test_warmup_reports_every_broken_function(self):
+
+        @validate(lazy=True)
+        def first(x):
+            "x -> x >"
+
+        @validate(lazy=True)
+        def valid(x):
+            "x -> x > 1"
+
+        @validate(lazy=True)
+        def second(x):
+            "x -> f(x) > 1"
+
+        with pytest.raises(RequiredSyntaxError) as excinfo:
+            warmup()
+        message = str(excinfo.value)
+        assert message.startswith("rules of 2 function(s) failed to compile")
+        assert "%s.%s: " % (__name__, first.__qualname__) in message
+        assert "<locals>.second: disallowed function call f" in message
+        assert "<locals>.valid" not in message
+        assert len(decorator._pending) == 2
+
+    def test_warmup_compiles_pending_functions(self):
+
+        @validate(callables_dict={"f": abs}, lazy=True)
+        def somefunction(x):
+            """
+            x -> f(x) > 1
+            """
+            return x
+
+        assert warmup() == 1
+        assert warmup() == 0
+
+        with pytest.raises(RequirementError):
+            somefunction(-1)
+
+        somefunction(-2)
+
+    def test_lazy_module_setting(self, monkeypatch):
+        monkeypatch.setattr(decorator, "LAZY", True)
+
+        @validate
+        def somefunction(x):
+            """
+            x -> x > 1
+            """
+            return x
+
+        assert warmup() == 1
+        assert somefunction(2) == 2
+
+    def test_lazy_is_inherited_by_register_callables(self):
+        lazy_validate = validate(lazy=True).register_callables({"f": abs})
+
+        @lazy_validate
+        def somefunction(x):
+            """
+            x -> f(x) > 1
+            """
+            return x
+
+        assert warmup() == 1
+
+
+class TestArgumentBinding(object):
+
+    def test_defaults_align_with_omitted_positionals(self):
+        requires = Requires("z", R("z") == 3)
+
+        @validate(requires)
+        def somefunction(x, y=2, z=3):
+            return x, y, z
+
+        assert somefunction(1, 5) == (1, 5, 3)
+        assert somefunction(1) == (1, 2, 3)
+
+        with pytest.raises(RequirementError):
+            somefunction(1, 5, 4)
+
+        with pytest.raises(RequirementError):
+            somefunction(1, z=4)
+
+    def test_defaults_are_overridden_by_keywords(self):
+        requires = Requires("y", R("y") > R("x"))
+
+        @validate(requires)
+        def somefunction(x, y=0):
+            return x, y
+
+        with pytest.raises(RequirementError):
+            somefunction(1)
+
+        assert somefunction(1, y=2) == (1, 2)
+
+    def test_extra_keyword_arguments_are_validated(self):
+        requires = Requires("z", R("z") > R("x"))
+
+        @validate(requires)
+        def somefunction(x, **kwargs):
+            return x, kwargs
+
+        with pytest.raises(RequirementError):
+            somefunction(2, z=1)
+
+        assert somefunction(1, z=2) == (1, {"z": 2})
+
+    def test_var_positional_arguments_are_ignored(self):
+        requires = Requires("x", "y")
+
+        @validate(requires)
+        def somefunction(x, *args, **kwargs):
+            return x, args
+
+        with pytest.raises(RequirementError):
+            somefunction(1, 2, 3)
+
+        assert somefunction(1, 2, 3, y=4) == (1, (2, 3))
@@ -3,8 +3,14 @@ from __future__ import unicode_literals
 
 import pytest
 
-from required import Requires, R, Func
-from required.dsl import build_requirements_factory, init_transformer, init_parser
+from lark.exceptions import UnexpectedInput
+
+from required import Requires, R, Func, RequiredSyntaxError
+from required.expressions import And, Or, Not
+from required.dsl import (
+    build_requirements_factory, init_transformer, init_parser, lazy_parser,
+    requirements_cache, RequirementsCache,
+)
 
 def custom_f(x):
     return x
@@ -13,6 +19,8 @@ statement_matches = [
     ("x -> y", Requires("x", "y"), {}),
     ("x -> x > (y + 1)", Requires("x", R("x") > R("y") + 1), {}),
     ("x -> x > y", Requires("x", R("x") > R("y")), {}),
+    ("x -> x > 1.5", Requires("x", R("x") > 1.5), {}),
+    ("x -> x > 1e3", Requires("x", R("x") > 1000.0), {}),
     ("x -> x < y", Requires("x", R("x") < R("y")), {}),
     ("x -> len(x) < y", Requires("x", Func(len, R("x")) < R("y")), {}),
     ("x -> x in y", Requires("x", R("x").in_(R("y"))), {}),
@@ -161,7 +169,33 @@ statement_matches = [
         """,
         Requires("arr", Func(len, R("arr")) >= 1),
         {}
-    )
+    ),
+    ("x -> y > 1 and z > 1", Requires("x", And(R("y") > 1, R("z") > 1)), {}),
+    ("x -> y > 1 or z > 1", Requires("x", Or(R("y") > 1, R("z") > 1)), {}),
+    ("x -> not y > 1", Requires("x", Not(R("y") > 1)), {}),
+    (
+        "x -> y > 1 or z > 1 and w > 1",
+        Requires("x", Or(R("y") > 1, And(R("z") > 1, R("w") > 1))),
+        {}
+    ),
+    (
+        "x -> (y > 1 or z > 1) and not w == 1",
+        Requires("x", And(Or(R("y") > 1, R("z") > 1), Not(R("w") == 1))),
+        {}
+    ),
+    (
+        "x > 1 and x < 5 -> y",
+        Requires(And(R("x") > 1, R("x") < 5), "y"),
+        {}
+    ),
+    ("order -> notes or android", Requires("order", Or(R("notes"), R("android"))), {}),
+    (
+        "address.postcode -> address.country == \"GB\"",
+        Requires("address.postcode", R("address.country") == "GB"),
+        {}
+    ),
+    ("items.0.sku -> len(items.0.sku) > 2", Requires("items.0.sku", Func(len, R("items.0.sku")) > 2), {}),
+    ("notes.android -> order.notes", Requires("notes.android", "order.notes"), {}),
 
 ]
 
@@ -174,3 +208,134 @@ class TestBuildRequirements(object):
         requirements_builder = build_requirements_factory(init_parser(), init_transformer(callables_dict))
         r1 = requirements_builder(dsl_txt)
         assert r1 == requires
+
+
+class TestParser(object):
+
+    def test_parser_is_shared(self):
+        assert init_parser() is init_parser()
+
+    def test_parser_is_lalr(self):
+        assert init_parser().options.parser == "lalr"
+
+    def test_requires_block_with_brace_in_string(self):
+        requirements_builder = build_requirements_factory(init_parser(), init_transformer({}))
+        requires = requirements_builder(
+            """
+            Requires {
+                x == "}" -> y
+            }
+            """
+        )
+        assert requires == Requires(R("x") == "}", "y")
+
+    def test_requires_block_with_brace_in_comment(self):
+        requirements_builder = build_requirements_factory(init_parser(), init_transformer({}))
+        requires = requirements_builder(
+            """
+            Requires {
+                # x needs y (see {notes})
+                x -> y
+                x -> z  # not "}
+            }
+            """
+        )
+        assert requires == Requires("x", "y") + Requires("x", "z")
+
+    @pytest.mark.parametrize("rules", ["a > 1 and b > 1 -> c", "a > 1 or (b > 1 and a < 3) -> c"])
+    def test_condition_reading_several_fields(self, rules):
+        requirements_builder = build_requirements_factory(init_parser(), init_transformer({}))
+        with pytest.raises(RequiredSyntaxError) as excinfo:
+            requirements_builder(rules)
+        assert "a, b" in str(excinfo.value)
+
+    def test_disallowed_function(self):
+        requirements_builder = build_requirements_factory(init_parser(), init_transformer({}))
+        with pytest.raises(RequiredSyntaxError):
+            requirements_builder("x -> f(x) > 1")
+
+    @pytest.mark.parametrize("rules", ["x. -> y", "x -> .y", "x..y -> z", "0.x -> y"])
+    def test_invalid_paths(self, rules):
+        requirements_builder = build_requirements_factory(init_parser(), init_transformer({}))
+        with pytest.raises(UnexpectedInput):
+            requirements_builder(rules)
+
+    def test_in_operator_requires_word_boundary(self):
+        requirements_builder = build_requirements_factory(init_parser(), init_transformer({}))
+        with pytest.raises(UnexpectedInput):
+            requirements_builder("x -> x inside")
+
+
+class TestRequirementsCache(object):
+
+    def setup_method(self, method):
+        requirements_cache.clear()
+
+    def test_identical_rules_compile_once(self):
+        requirements_builder = build_requirements_factory(init_parser(), init_transformer({}))
+        r1 = requirements_builder("x -> y\n    x -> z")
+        r2 = requirements_builder(
+            """
+            Some documentation
+
+            Requires {
+                x ->   y
+                x -> z
+            }
+            """
+        )
+        assert r1 is r2
+        info = requirements_cache.info()
+        assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+    def test_different_callables_compile_separately(self):
+        r1 = build_requirements_factory(
+            init_parser(), init_transformer({"f": len}))("x -> f(x) > 1")
+        r2 = build_requirements_factory(
+            init_parser(), init_transformer({"f": abs}))("x -> f(x) > 1")
+        r3 = build_requirements_factory(
+            init_parser(), init_transformer({"f": abs}))("x -> f(x) > 1")
+        assert r1 is not r2
+        assert r2 is r3
+
+    def test_other_parsers_skip_the_cache(self):
+        parsed = []
+
+        class Parser(object):
+            def parse(self, text):
+                parsed.append(text)
+                return init_parser().parse(text)
+
+        shared = build_requirements_factory(init_parser(), init_transformer({}))("x -> y")
+        assert build_requirements_factory(lazy_parser, init_transformer({}))("x -> y") is shared
+
+        requires = build_requirements_factory(Parser(), init_transformer({}))("x -> y")
+        assert requires is not shared
+        assert parsed == ["x -> y"]
+        assert requirements_cache.info().currsize == 1
+
+    def test_cache_is_bounded(self):
+        cache = RequirementsCache(maxsize=2)
+        requirements_builder = build_requirements_factory(
+            init_parser(), init_transformer({}), cache=cache)
+        r1 = requirements_builder("x -> y")
+        requirements_builder("x -> z")
+        requirements_builder("y -> z")
+        assert cache.info().currsize == 2
+        assert requirements_builder("x -> y") is not r1
+
+        cache.resize(1)
+        assert cache.info().currsize == 1
+
+    def test_cache_can_be_disabled(self):
+        requirements_builder = build_requirements_factory(
+            init_parser(), init_transformer({}), cache=None)
+        assert requirements_builder("x -> y") is not requirements_builder("x -> y")
+        assert requirements_cache.info().currsize == 0
+
+    def test_clear_resets_counters(self):
+        requirements_builder = build_requirements_factory(init_parser(), init_transformer({}))
+        requirements_builder("x -> y")
+        requirements_builder("x -> y")
+        requirements_cache.clear()
+        assert requirements_cache.info() == (0, 0, 256, 0)
@@ -3,7 +3,7 @@ from __future__ import unicode_literals
 
 from required.expressions import (
     R, Lte, Lt, Gte, Gt, Eq, NotEq,
-    In, And, Or
+    In, And, Or, Not, Func, FieldOp,
 )
 
 
@@ -69,6 +69,29 @@ class TestComparisonOperators(object):
         assert op({"x": 1, "y": (1, 2, 3)})
         assert not op({"x": 10, "y": (1, 2, 3)})
 
+    def test_in_operator_constant_members(self):
+        op = In(R("x"), [1, 2, 3])
+        assert op._members == frozenset([1, 2, 3])
+        assert op({"x": 2})
+        assert not op({"x": 4})
+        assert op({"x": [4, 3]})
+        assert not op({"x": (4, 5)})
+        # unhashable values fall back to comparing with ==
+        assert not op({"x": {"a": 1}})
+
+    def test_in_operator_matches_contains(self):
+        containers = [[1, "a", None], (2.0, 3), ["ab"], []]
+        values = [1, 1.0, "a", "b", None, 2, [1, "a"], ("ab", ), [], {}]
+        for container in containers:
+            op = In(R("x"), container)
+            for value in values:
+                assert op({"x": value}) == In.contains(value, container)
+
+    def test_in_operator_strings_are_not_members(self):
+        op = In(R("x"), "abc")
+        assert op._members is None
+        assert op({"x": "bc"})
+
     def test_and_operator(self):
         exp1 = R("x") == 1
         exp2 = R("y") == 2
@@ -88,3 +111,94 @@ class TestComparisonOperators(object):
         assert op({"x": 1, "y": 10})
         assert op({"x": 10, "y": 2})
         assert not op({"x": 10, "y": 10})
+
+    def test_not_operator(self):
+        op = Not(R("x") == 1)
+
+        assert op({"x": 2})
+        assert not op({"x": 1})
+        assert Not(R("x")).get_fields() == {"x"}
+        assert ~(R("x") == 1) == op
+
+    def test_and_short_circuits(self):
+        calls = []
+
+        def expensive(value):
+            calls.append(value)
+            return value
+
+        op = And(R("x") == 1, Func(expensive, R("y")) == 2)
+
+        assert not op({"x": 2})
+        assert calls == []
+        assert op({"x": 1, "y": 2})
+        assert calls == [2]
+
+    def test_or_short_circuits(self):
+        calls = []
+
+        def expensive(value):
+            calls.append(value)
+            return value
+
+        op = Or(R("x") == 1, Func(expensive, R("y")) == 2)
+
+        assert op({"x": 1})
+        assert calls == []
+        assert op({"x": 2, "y": 2})
+        assert calls == [2]
+
+    def test_nested_get_fields(self):
+        op = And(R("x") == 1, Or(R("y") == 1, Not(R("z") == 1)))
+        assert op.get_fields() == {"x", "y", "z"}
+
+
+class TestInterning(object):
+
+    def test_equal_nodes_are_shared(self):
+        assert R("x") is R("x")
+        assert (R("x") + 1 > R("y")) is (R("x") + 1 > R("y"))
+        assert Func(len, R("x")) is Func(len, R("x"))
+        assert In(R("x"), [1, 2]) is In(R("x"), [1, 2])
+        assert In(R("x"), [1, 2]) is not In(R("x"), (1, 2))
+
+    def test_mirrored_nodes_are_distinct(self):
+        assert (R("x") < R("y")) is not (R("y") < R("x"))
+        assert (R("x") < R("y")) != (R("y") < R("x"))
+        assert FieldOp(pow, R("x"), 2) is not FieldOp(pow, 2, R("x"))
+
+    def test_constants_are_keyed_by_type(self):
+        assert (R("x") == 1) is not (R("x") == 1.0)
+        assert (R("x") == 1) is not (R("x") == True)  # noqa: E712
+
+    def test_constants_keep_their_type(self):
+        def fmt(value, constant):
+            return "%r" % constant
+
+        assert (Func(fmt, R("x"), 1) == "1")({"x": 0})
+        assert (Func(fmt, R("x"), 1.0) == "1.0")({"x": 0})
+
+    def test_kwargs_are_part_of_the_key(self):
+        assert Func(round, R("x"), ndigits=1) is Func(round, R("x"), ndigits=1)
+        assert Func(round, R("x"), ndigits=1) is not Func(round, R("x"), ndigits=2)
+
+    def test_unhashable_constants_are_not_shared(self):
+        op = In(R("x"), {"a": 1})
+        assert op is not In(R("x"), {"a": 1})
+        assert op == op
+        assert hash(op) == hash(op)
+
+
+class TestCompactNodes(object):
+
+    def test_nodes_have_no_instance_dict(self):
+        nodes = [
+            R("x"), R("x") > 1, And(R("x") > 1, R("y") > 1), Not(R("x")),
+            In(R("x"), [1]), FieldOp(len, R("x")),
+        ]
+        for node in nodes:
+            assert not hasattr(node, "__dict__")
+
+    def test_fieldop_without_kwargs_shares_empty_kwargs(self):
+        assert FieldOp(len, R("x")).kwargs is FieldOp(abs, R("x")).kwargs
+        assert FieldOp(round, R("x"), ndigits=1).kwargs == {"ndigits": 1}
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import sys
+import random
+
+import pytest
+
+from required import Requires, R, RequirementError
+
+from .helpers import error_of, reference
+
+
+def chain(length, cycle=False):
+    return Requires.combine(
+        Requires("f%d" % index, "f%d" % ((index + 1) % length if cycle else index + 1))
+        for index in range(length))
+
+
+def random_requires(rng, fields=6, rules=10):
+    names = ["f%d" % index for index in range(fields)]
+    parts = []
+    for _ in range(rules):
+        source, target = rng.choice(names), rng.choice(names)
+        kind = rng.random()
+        if kind < 0.5:
+            parts.append(Requires(source, target))
+        elif kind < 0.8:
+            parts.append(Requires(source, R(target) > rng.randint(0, 2)))
+        else:
+            parts.append(Requires(R(source) == rng.randint(0, 2), target))
+    return Requires.combine(parts), names
+
+
+def random_payload(rng, names):
+    present = [name for name in names if rng.random() < 0.8]
+    rng.shuffle(present)
+    return dict((name, rng.randint(0, 3)) for name in present)
+
+
+class TestDeepGraphs(object):
+
+    @pytest.mark.parametrize("cycle", [False, True])
+    def test_validate_long_chain(self, cycle):
+        length = sys.getrecursionlimit() * 2
+        requires = chain(length, cycle)
+        data = dict(("f%d" % index, index) for index in range(length + 1))
+        requires.validate(data)
+        requires.validate(dict(reversed(list(data.items()))))
+
+        del data["f%d" % (length // 2)]
+        with pytest.raises(RequirementError) as excinfo:
+            requires.validate(data)
+        assert excinfo.value.dependency_name == "f%d" % (length // 2)
+
+    def test_random_graphs_match_reference(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            requires, names = random_requires(rng)
+            plan = requires.compile()
+            for _ in range(5):
+                data = random_payload(rng, names)
+                assert error_of(plan.validate, data) == error_of(reference(requires), data)
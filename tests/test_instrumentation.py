@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from required import Requires, R, RequirementError, instrumentation
+from required.dsl import build_requirements_factory, init_parser, init_transformer
+from required.instrumentation import Instrumentation, RuleStats
+
+
+class Recorder(Instrumentation):
+
+    def __init__(self):
+        self.events = []
+
+    def rule(self, field, dependency, seconds, error):
+        self.events.append(("rule", field, dependency.name, error is not None))
+
+    def validation(self, seconds, error):
+        self.events.append(("validation", error is not None))
+
+
+class TestInstrumentation(object):
+
+    def setup_method(self, method):
+        self.previous = instrumentation.uninstall()
+
+    def teardown_method(self, method):
+        instrumentation.install(self.previous)
+
+    def test_no_hook_by_default(self):
+        assert instrumentation.hook is None
+        Requires("x", "y").validate({"x": 1, "y": 1})
+
+    def test_install_returns_previous_hook(self):
+        first, second = Recorder(), Recorder()
+        assert instrumentation.install(first) is None
+        assert instrumentation.install(second) is first
+        assert instrumentation.uninstall() is second
+
+    def test_hook_sees_every_rule(self):
+        recorder = Recorder()
+        instrumentation.install(recorder)
+        requires = Requires("x", "y") + Requires("z", R("z") > 1)
+
+        requires.validate({"x": 1, "y": 1, "z": 2})
+        with pytest.raises(RequirementError):
+            requires.validate({"x": 1, "y": 1, "z": 1})
+
+        assert recorder.events == [
+            ("rule", "x", "y", False),
+            ("rule", "z", "z", False),
+            ("validation", False),
+            ("rule", "x", "y", False),
+            ("rule", "z", "z", True),
+            ("validation", True),
+        ]
+
+    def test_rule_stats(self):
+        stats = RuleStats()
+        instrumentation.install(stats)
+        requires = Requires("x", R("y") > 1) + Requires("x", "z")
+
+        for data in ({"x": 1, "y": 2, "z": 1}, {"x": 1, "y": 0, "z": 1}):
+            try:
+                requires.validate(data)
+            except RequirementError:
+                pass
+        assert requires.errors({"x": 1, "y": 0}) != []
+
+        by_name = dict((stat.dependency, stat) for stat in stats.rules())
+        assert (by_name["y"].calls, by_name["y"].failures) == (3, 2)
+        assert (by_name["z"].calls, by_name["z"].failures) == (2, 1)
+        assert by_name["y"].expression is (R("y") > 1)
+        assert by_name["y"].p50 <= by_name["y"].p99
+        assert (stats.validations, stats.validation_failures) == (2, 1)
+
+        stats.reset()
+        assert stats.rules() == []
+        assert stats.validations == 0
+
+    def test_validate_many_is_instrumented(self):
+        stats = RuleStats()
+        instrumentation.install(stats)
+        requires = Requires("x", "y")
+        assert list(requires.validate_many([{"x": 1}, {"x": 1, "y": 1}])) == [0]
+        stat, = stats.rules()
+        assert (stat.calls, stat.failures) == (2, 1)
+
+    def test_parse_and_compile_timing(self):
+        stats = RuleStats()
+        instrumentation.install(stats)
+        build = build_requirements_factory(init_parser(), init_transformer({}), cache=None)
+        requires = build("x -> y")
+        requires.compile()
+        requires.compile()
+        assert stats.parses == 1
+        assert stats.compiles == 1
+        assert stats.parse_time > 0
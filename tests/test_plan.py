@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+from collections import OrderedDict
+
+import pytest
+
+from required import Requires, R, RequirementError, Func
+from required.accessors import Record
+from required.plan import ValidationPlan
+
+from .helpers import error_of, reference, requirements, payloads
+
+
+class TestValidationPlan(object):
+
+    @pytest.mark.parametrize("requires", requirements)
+    @pytest.mark.parametrize("data", payloads)
+    def test_plan_matches_requires(self, requires, data):
+        plan = requires.compile()
+        assert error_of(plan.validate, data) == error_of(reference(requires), data)
+
+    def test_plan_resolves_direct_dependencies(self):
+        requires = Requires("x", "y") + Requires("y", "z")
+        plan = requires.compile()
+        assert [dep.name for dep in plan.deps("x", 1)] == ["y"]
+        assert [dep.name for dep in plan.deps("y", 1)] == ["z"]
+
+    def test_errors_name_the_declaring_field(self):
+        requires = Requires("a", "b") + Requires("b", "c")
+        data = {"a": 1, "b": 2}
+        expected = ("b", "c", None, "b requires 'c' to be present")
+        assert error_of(requires.validate, data) == expected
+        assert error_of(reference(requires), data) == expected
+        assert [str(e) for e in requires.errors(data)] == [expected[-1]]
+
+    def test_plan_only_follows_partial_when_condition_holds(self):
+        requires = Requires(R("x") == 1, "y") + Requires("y", "z")
+        plan = requires.compile()
+        assert [dep.name for dep in plan.deps("x", 1)] == ["y"]
+        assert list(plan.deps("x", 2)) == []
+
+    def test_plan_does_not_change_requires(self):
+        requires = Requires(R("x") == 1, "y") + Requires("x", "z")
+        adj = dict(requires.adj)
+        plan = requires.compile()
+        plan.validate({"x": 1, "y": 1, "z": 1})
+        assert requires.adj == adj
+
+    def test_plan_raises_requirement_error(self):
+        plan = Requires("x", R("y") > 1, message="custom message").compile()
+        with pytest.raises(RequirementError) as excinfo:
+            plan.validate({"x": 1, "y": 1})
+        assert str(excinfo.value) == "custom message"
+        plan.validate({"x": 1, "y": 2})
+
+
+class TestEvaluationMemo(object):
+
+    def counter(self):
+        calls = []
+
+        def count(value):
+            calls.append(value)
+            return len(value)
+        return calls, count
+
+    def test_expression_shared_by_dependencies_is_evaluated_once(self):
+        calls, count = self.counter()
+        # expands to one Dependency for y and one for z
+        requires = Requires("x", Func(count, R("y")) + Func(count, R("z")) > 1)
+        requires.validate({"x": 1, "y": "a", "z": "b"})
+        assert sorted(calls) == ["a", "b"]
+
+    def test_expression_reached_from_several_fields_is_evaluated_once(self):
+        calls, count = self.counter()
+        expression = Func(count, R("z")) > 0
+        requires = Requires("x", expression) + Requires("y", expression)
+        requires.validate({"x": 1, "y": 1, "z": "a"})
+        assert calls == ["a"]
+
+    def test_shared_callable_is_called_once(self):
+        calls, count = self.counter()
+        length = Func(count, R("y"))
+        requires = Requires("x", length > 1) + Requires("x", length < 5)
+        requires.validate({"x": 1, "y": "abc"})
+        assert calls == ["abc"]
+
+        with pytest.raises(RequirementError):
+            requires.validate({"x": 1, "y": "abcdef"})
+        assert calls == ["abc", "abcdef"]
+
+    def test_memo_is_per_call(self):
+        calls, count = self.counter()
+        requires = Requires("x", Func(count, R("y")) > 1)
+        requires.validate({"x": 1, "y": "ab"})
+        requires.validate({"x": 1, "y": "ab"})
+        assert requires.errors({"x": 1, "y": "a"}) != []
+        assert calls == ["ab", "ab", "a"]
+
+    def test_memo_per_row(self):
+        calls, count = self.counter()
+        requires = Requires("x", Func(count, R("y")) > 1)
+        rows = [{"x": 1, "y": "a"}, {"x": 1, "y": "ab"}]
+        assert list(requires.validate_many(rows)) == [0]
+        assert calls == ["a", "ab"]
+
+
+class TestValidateMany(object):
+
+    def test_validate_many_returns_failing_rows(self):
+        requires = Requires("x", "y") + Requires("y", R("y") > 1)
+        rows = [
+            {"x": 1, "y": 2},
+            {"x": 1},
+            {"y": 1},
+            {"z": 1},
+        ]
+        results = requires.validate_many(rows)
+
+        assert sorted(results) == [1, 2]
+        (error, ) = results[1]
+        assert (error.field, error.dependency_name) == ("x", "y")
+        (error, ) = results[2]
+        assert (error.field, error.dependency_name) == ("y", "y")
+
+    def test_validate_many_matches_validate(self):
+        requires = (
+            Requires(R("x") == 1, "y") + Requires("y", "z") +
+            Requires("z", R("x") != 0))
+        plan = requires.compile()
+        results = plan.validate_many(payloads)
+        for index, data in enumerate(payloads):
+            expected = error_of(plan.validate, data)
+            if expected is None:
+                assert index not in results
+            else:
+                (error, ) = results[index]
+                assert expected == (error.field, error.dependency_name,
+                                    error.dependency_value, str(error))
+
+    def test_iter_validate_many_is_lazy(self):
+        requires = Requires("x", "y")
+
+        def rows():
+            yield {"x": 1, "y": 1}
+            yield {"x": 1}
+            raise AssertionError("consumed past the first failure")
+
+        results = requires.iter_validate_many(rows())
+        index, errors = next(results)
+        assert index == 1
+        assert isinstance(errors[0], RequirementError)
+
+
+class TestErrors(object):
+
+    def test_errors_returns_every_violation(self):
+        requires = (
+            Requires("x", "y") + Requires("x", R("z") > 1) + Requires("w", R("w") < 0)
+        )
+        errors = requires.errors({"x": 1, "z": 0, "w": 1})
+        assert [(e.field, e.dependency_name) for e in errors] == [
+            ("x", "y"), ("x", "z"), ("w", "w"),
+        ]
+
+    def test_errors_empty_when_valid(self):
+        requires = Requires("x", "y")
+        assert requires.errors({"x": 1, "y": 1}) == []
+
+    def test_errors_first_matches_validate(self):
+        for requires in requirements:
+            for data in payloads:
+                expected = error_of(requires.validate, data)
+                if not isinstance(expected, tuple):
+                    continue
+                error = requires.errors(data, max_errors=1)[0]
+                assert expected == (error.field, error.dependency_name,
+                                    error.dependency_value, str(error))
+
+    def test_errors_are_capped(self):
+        requires = Requires.combine(Requires("x", "y%s" % i) for i in range(100))
+        assert len(requires.errors({"x": 1}, max_errors=3)) == 3
+        assert len(requires.errors({"x": 1})) == 100
+
+    def test_errors_deduplicates_dependencies(self):
+        # y is declared both as a full and a partial dependency of x
+        requires = Requires("x", "y") + Requires(R("x") == 1, "y")
+        errors = requires.errors({"x": 1})
+        assert [(e.field, e.dependency_name, str(e)) for e in errors] == [
+            ("x", "y", "x requires 'y' to be present"),
+        ]
+
+        # a different dependency on y is a violation of its own
+        requires += Requires(R("x") == 1, R("y") > 1)
+        assert [(e.field, e.dependency_name) for e in requires.errors({"x": 1})] == [
+            ("x", "y"), ("x", "y"),
+        ]
+
+    def test_errors_of_long_chain(self):
+        length = 2500
+        requires = Requires.combine(
+            Requires("f%d" % index, "f%d" % (index + 1)) for index in range(length))
+        plan = requires.compile()
+        checks = []
+
+        def check(*args):
+            checks.append(1)
+            return ValidationPlan._check(plan, *args)
+
+        plan._check = check
+        data = dict(("f%d" % index, 1) for index in range(length))
+        errors = plan.errors(data)
+        assert [(e.field, e.dependency_name) for e in errors] == [
+            ("f%d" % (length - 1), "f%d" % length),
+        ]
+        assert len(checks) == length
+
+    def test_validate_many_collects(self):
+        requires = Requires("x", "y") + Requires("x", "z")
+        results = requires.validate_many([{"x": 1}, {"x": 1, "y": 1, "z": 1}], collect=True)
+        assert list(results) == [0]
+        assert [e.dependency_name for e in results[0]] == ["y", "z"]
+
+        results = requires.validate_many([{"x": 1}], collect=True, max_errors=1)
+        assert len(results[0]) == 1
+
+
+class TestWidePayloads(object):
+
+    fillers = [("w%d" % index, index) for index in range(50)]
+
+    def wide(self, *fields):
+        # fields with rules spread among many without
+        data = OrderedDict(self.fillers[:25])
+        data.update(fields)
+        data.update(self.fillers[25:])
+        return data
+
+    def test_first_error_in_data_order(self):
+        # x comes first among the rules, but y first in the data
+        requires = Requires("x", "z") + Requires("y", R("z") > 1)
+        data = self.wide(("y", 1), ("x", 1))
+        with pytest.raises(RequirementError) as excinfo:
+            requires.validate(data)
+        assert excinfo.value.field == "y"
+        assert error_of(requires.validate, data) == error_of(reference(requires), data)
+
+    def test_callables_are_called_once(self):
+        calls = []
+
+        def count(value):
+            calls.append(value)
+            return len(value)
+
+        length = Func(count, R("v"))
+        requires = Requires("x", length > 1) + Requires("y", length < 5)
+        with pytest.raises(RequirementError) as excinfo:
+            requires.validate(self.wide(("y", 1), ("v", "abcdef"), ("x", 1)))
+        assert excinfo.value.field == "y"
+        assert calls == ["abcdef"]
+
+    def test_records(self):
+        requires = Requires("x", "z") + Requires("y", R("z") > 1)
+        for data in (self.wide(("x", 1)), self.wide(("y", 1), ("x", 1), ("z", 1))):
+            record = Record(data, tuple(data))
+            assert error_of(requires.validate, record) == error_of(requires.validate, data)
+            assert error_of(requires.validate, record) == error_of(reference(requires), data)
+
+
+class TestRevalidate(object):
+
+    values = [None, 0, 1, 2, [1, 2], [3]]
+
+    def changes(self, data):
+        for field in ["x", "y", "z", "w"]:
+            for value in self.values:
+                changed = dict(data)
+                if value is None:
+                    changed.pop(field, None)
+                else:
+                    changed[field] = value
+                yield field, changed
+
+    @pytest.mark.parametrize("requires", requirements)
+    def test_revalidate_matches_validate(self, requires):
+        for data in payloads:
+            if error_of(requires.validate, data) is not None:
+                continue
+            for field, changed in self.changes(data):
+                assert error_of(lambda data: requires.revalidate(data, [field]), changed) == \
+                    error_of(requires.validate, changed)
+
+    def test_only_rules_reading_changed_fields_are_checked(self):
+        calls = []
+
+        def count(value):
+            calls.append(value)
+            return value
+
+        requires = (
+            Requires("x", Func(count, R("y")) > 0) +
+            Requires("z", Func(count, R("w")) > 0)
+        )
+        data = {"x": 1, "y": 1, "z": 1, "w": 1}
+        requires.revalidate(data, ["w"])
+        assert calls == [1]
+        requires.revalidate(dict(data, y=2), ["y"])
+        assert calls == [1, 2]
+
+        with pytest.raises(RequirementError) as excinfo:
+            requires.revalidate(dict(data, y=0), ["y"])
+        assert excinfo.value.field == "x"
+
+    def test_transitive_dependencies(self):
+        requires = Requires("x", "y") + Requires("y", R("z") > 1)
+        with pytest.raises(RequirementError) as excinfo:
+            requires.revalidate({"x": 1, "y": 1, "z": 1}, ["z"])
+        assert excinfo.value.field == "y"
+        requires.revalidate({"x": 1, "y": 1, "z": 2}, ["z"])
+        requires.revalidate({"z": 1}, ["z"])
+
+    def test_keyword_arguments_of_callables(self):
+        def between(value, low):
+            return value > low
+
+        requires = Requires("x", Func(between, R("x"), low=R("y")) == True)  # noqa: E712
+        requires.revalidate({"x": 2, "y": 1}, ["y"])
+        with pytest.raises(RequirementError):
+            requires.revalidate({"x": 2, "y": 3}, ["y"])
+
+    def test_partial_conditions(self):
+        requires = Requires(R("x") == 1, "y")
+        requires.revalidate({"x": 2}, ["x"])
+        with pytest.raises(RequirementError):
+            requires.revalidate({"x": 1}, ["x"])
+        with pytest.raises(RequirementError):
+            requires.revalidate({"x": 1}, ["y"])
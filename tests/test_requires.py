@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import threading
+
 import pytest
 
 from required import Requires, R, RequirementError, Func
@@ -400,3 +402,131 @@ class TestRequires(object):
         requires.validate(data)
 
 
+
+class TestRequiresCombine(object):
+
+    def test_combine_matches_add(self):
+        rules = [
+            Requires("x", "y"),
+            Requires("y", R("z") > 1),
+            Requires(R("x") == 1, "z"),
+            Requires(R("x") == 2, R("y") < R("z")),
+        ]
+        added = rules[0] + rules[1] + rules[2] + rules[3]
+        assert Requires.combine(rules) == added
+
+    def test_combine_does_not_copy_expressions(self):
+        expression = R("y") > 1
+        requires = Requires.combine([Requires("x", expression), Requires("z", "x")])
+        dependency, = requires.adj[hash(R("x"))]
+        assert dependency.expression is expression
+
+    def test_add_does_not_modify_operands(self):
+        lhs = Requires("x", "y")
+        rhs = Requires("x", "z")
+        requires = lhs + rhs
+
+        assert len(requires.adj[hash(R("x"))]) == 2
+        assert len(lhs.adj[hash(R("x"))]) == 1
+        assert len(rhs.adj[hash(R("x"))]) == 1
+
+    def test_combine_validates(self):
+        requires = Requires.combine(
+            Requires("x%s" % i, "x%s" % (i + 1)) for i in range(100))
+
+        with pytest.raises(RequirementError):
+            requires.validate({"x0": 1})
+
+        requires.validate(dict(("x%s" % i, i) for i in range(101)))
+
+
+class TestStructuralEquality(object):
+
+    def test_mirrored_rules_are_not_merged(self):
+        requires = Requires("a", R("x") < R("y")) + Requires("a", R("y") < R("x"))
+        assert len(requires.compile().deps("a", 1)) == 4
+        with pytest.raises(RequirementError):
+            requires.validate({"a": 1, "x": 1, "y": 2})
+        with pytest.raises(RequirementError):
+            requires.validate({"a": 1, "x": 2, "y": 1})
+
+    def test_partials_with_reordered_arguments_are_distinct(self):
+        requires = (
+            Requires(Func(pow, R("x"), 2) == 8, "y") +
+            Requires(Func(pow, 2, R("x")) == 8, "z")
+        )
+        requires.validate({"x": 3, "z": 1})
+        with pytest.raises(RequirementError) as excinfo:
+            requires.validate({"x": 3, "y": 1})
+        assert excinfo.value.dependency_name == "z"
+
+    def test_dependencies_have_no_instance_dict(self):
+        requires = Requires(R("x") == 1, "y") + Requires("x", R("z") > 1)
+        dependencies = [dep for deps in requires.adj.values() for dep in deps]
+        assert dependencies
+        for dependency in dependencies:
+            assert not hasattr(dependency, "__dict__")
+        assert not hasattr(requires.partials, "__dict__")
+
+    def test_equal_rules_share_expressions(self):
+        lhs = Requires("x", Func(len, R("y")) > 1)
+        rhs = Requires("x", Func(len, R("y")) > 1)
+        assert lhs == rhs
+        assert lhs.adj[hash(R("x"))][0].expression is rhs.adj[hash(R("x"))][0].expression
+
+
+class TestRequiresConcurrency(object):
+
+    def test_validation_does_not_modify_graph(self):
+        requires = Requires("x", "z") + Requires(R("x") == 1, "y") + Requires("y", "z")
+        adj = dict(requires.adj)
+
+        for _ in range(100):
+            requires.validate({"x": 1, "y": 1, "z": 1})
+            with pytest.raises(RequirementError):
+                requires.validate({"x": 1, "z": 1})
+            requires.deps("x", 1)
+
+        assert requires.adj == adj
+        assert [len(deps) for deps in requires.adj.values()] == [len(deps) for deps in adj.values()]
+
+    def test_compiled_plan_is_cached(self):
+        requires = Requires("x", "y")
+        assert requires.compile() is requires.compile()
+
+    def test_shared_requires_across_threads(self):
+        requires = (
+            Requires("x", "z") + Requires(R("x") == 1, "y") +
+            Requires(R("x") == 2, R("y") > 1) + Requires("y", "z")
+        )
+        adj = dict(requires.adj)
+        payloads = [
+            ({"x": 1, "y": 1, "z": 1}, None),
+            ({"x": 1, "z": 1}, "y"),
+            ({"x": 2, "y": 1, "z": 1}, "y"),
+            ({"x": 2, "y": 2, "z": 1}, None),
+            ({"x": 3}, "z"),
+        ]
+        failures = []
+
+        def worker():
+            try:
+                for _ in range(500):
+                    for data, missing in payloads:
+                        try:
+                            requires.validate(data)
+                        except RequirementError as e:
+                            assert e.dependency_name == missing
+                        else:
+                            assert missing is None
+            except Exception as e:  # pragma: no cover
+                failures.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert failures == []
+        assert requires.adj == adj
@@ -44,3 +44,15 @@ class TestPy3Requires(object):
             somefunction()
 
         somefunction(x=2, y=1)
+
+    def test_required_decorator_keyword_only_defaults_with_extra_kwargs(self):
+        requires = Requires("y", R("y") > R("x"))
+
+        @validate(requires)
+        def somefunction(x, *, y=0, **kwargs):
+            return x, y
+
+        with pytest.raises(RequirementError):
+            somefunction(1, z=2)
+
+        assert somefunction(1, y=2, z=2) == (1, 2)
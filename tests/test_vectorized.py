@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import random
+
+import pytest
+
+from required import Requires, R, Func
+from required.expressions import And, Or, Not
+
+np = pytest.importorskip("numpy")
+
+from required.vectorized import ColumnarPlan, validate_columns  # noqa: E402
+
+
+def to_columns(rows, fields, dtype=float):
+    columns = {}
+    for field in fields:
+        values = [row.get(field, 0) for row in rows]
+        mask = [field not in row for row in rows]
+        columns[field] = np.ma.array(np.array(values, dtype=dtype), mask=mask)
+    return columns
+
+
+def failing_rows(requires, rows):
+    return sorted(requires.validate_many(rows))
+
+
+requirements = [
+    Requires("x", "y"),
+    Requires("x", "y") + Requires("y", "z"),
+    Requires("x", R("y") > 1) + Requires("y", R("z") < R("y")),
+    Requires("x", R("x") + 1 == R("y") - 1),
+    Requires("x", R("x") * 2 >= R("y") ** 2),
+    Requires("x", R("x") / 2 < R("y")),
+    Requires("x", R("x").in_([1, 2])),
+    Requires("x", And(R("x") > 0, R("y") > 0)),
+    Requires("x", Or(R("x") > 1, R("y") > 1)),
+    Requires("x", Not(R("y") == 1)),
+    Requires("x", And(R("x") > 1, Or(R("y") == 1, Not(R("z") == 1)))),
+    Requires(And(R("x") > 0, Not(R("x") == 2)), "y"),
+    Requires("x", Func(abs, R("x")) > 1),
+    Requires(R("x") == 1, "y") + Requires(R("x") == 2, "z"),
+    Requires(R("x") > 1, R("x") == R("y")) + Requires(R("x") < 1, R("x") != R("y")),
+    Requires(R("x") == 1, "y") + Requires("y", "z") + Requires("z", R("x") > 0),
+]
+
+
+def random_rows(count, seed):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        row = {}
+        for field in ("x", "y", "z"):
+            if rng.random() < 0.8:
+                row[field] = rng.choice([-1, 0, 1, 2, 3])
+        rows.append(row)
+    return rows
+
+
+class TestColumnarPlan(object):
+
+    @pytest.mark.parametrize("requires", requirements)
+    def test_failures_match_row_validation(self, requires):
+        rows = random_rows(300, seed=len(requirements))
+        result = validate_columns(requires, to_columns(rows, "xyz"))
+        assert list(result.failed_rows()) == failing_rows(requires, rows)
+
+    def test_failure_matrix_per_rule(self):
+        requires = Requires("x", "y") + Requires("x", R("z") > 1)
+        columns = {
+            "x": np.array([1, 1, 1]),
+            "y": np.ma.array([1, 1, 1], mask=[False, True, False]),
+            "z": np.array([2, 2, 0]),
+        }
+        result = ColumnarPlan(requires).evaluate(columns)
+        failures = dict(
+            ((field, dep.name), list(row)) for (field, dep), row in result)
+        assert failures[("x", "y")] == [False, True, False]
+        assert failures[("x", "z")] == [False, False, True]
+
+    def test_present_masks(self):
+        requires = Requires("x", "y")
+        columns = {"x": np.array([1, 1]), "y": np.array([1, 1])}
+        result = validate_columns(requires, columns, present={"y": [True, False]})
+        assert list(result.failed_rows()) == [1]
+
+    def test_missing_column_is_absent(self):
+        requires = Requires("x", "y")
+        result = validate_columns(requires, {"x": np.array([1, 2])})
+        assert list(result.failed_rows()) == [0, 1]
+
+    def test_object_columns_fall_back_to_elementwise(self):
+        requires = Requires("x", Func(len, R("x")) > 1) + Requires("y", R("y").in_(R("z")))
+        rows = [
+            {"x": [1, 2], "y": 1, "z": [1, 2]},
+            {"x": [1], "y": 3, "z": [1, 2]},
+            {"x": "ab", "y": 3, "z": [3]},
+            {"y": [3], "z": [3, 4]},
+        ]
+        columns = to_columns(rows, "xyz", dtype=object)
+        result = validate_columns(requires, columns)
+        assert list(result.failed_rows()) == failing_rows(requires, rows) == [1]
+
+    def test_pandas_dataframe(self):
+        pd = pytest.importorskip("pandas")
+        requires = Requires("x", R("y") > 1)
+        frame = pd.DataFrame({"x": [1.0, 1.0, None], "y": [2.0, None, 0.0]})
+        result = validate_columns(requires, frame)
+        assert list(result.failed_rows()) == [1]
+
+    def test_columns_must_have_the_same_length(self):
+        with pytest.raises(ValueError):
+            validate_columns(Requires("x", "y"), {"x": np.zeros(2), "y": np.zeros(3)})